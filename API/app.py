@@ -1,22 +1,69 @@
-from fastapi import FastAPI
-import subprocess
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+import asyncio
+import hashlib
+import json
+import threading
+import main
+from API.job_queue import JobQueue
+from API.headline_index import HeadlineIndex
+from API.micro_batcher import MicroBatcher, QueueFull, REQUEST_TIMEOUT
+from sentiments import model_registry
+from sentiments.finbert_engine import score_headlines
 
 app = FastAPI()
 
+# 🧵 One background worker runs pipeline jobs; requests only enqueue and read state
+jobs = JobQueue({"pipeline": lambda on_event: main.run_full_pipeline(on_event=on_event)})
+
+# 📇 Scored headlines served from memory; a finished pipeline job publishes new rows to it
+headlines = HeadlineIndex()
+jobs.on_finish.append(lambda job: headlines.refresh())
+
+# ⚡ Ad-hoc scoring: concurrent requests are grouped into one FinBERT forward pass
+scorer = MicroBatcher(lambda texts: score_headlines(texts, *model_registry.get_finbert()))
+MAX_SCORE_HEADLINES = 256
+
+class ScoreRequest(BaseModel):
+    headline: str = None
+    headlines: list[str] = None
+
+@app.on_event("startup")
+def warm_models():
+    # 🔥 Load FinBERT + NER in the background so /status answers immediately
+    threading.Thread(target=model_registry.warm_up, daemon=True).start()
+    threading.Thread(target=headlines.refresh, daemon=True).start()
+
+def conditional(request, payload):
+    # Weak ETag over the index version and the query: unchanged data answers 304 with no body
+    etag = 'W/"' + hashlib.sha1(f"{payload['version']}?{request.url.query}".encode("utf-8")).hexdigest()[:20] + '"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=json.dumps(payload), media_type="application/json", headers={"ETag": etag})
+
 @app.get("/")
 def home():
     return {
         "message": "API is running on Render!",
         "routes": {
             "/status": "Check if service is up",
-            "/run": "Trigger main pipeline",
+            "/run": "Queue the main pipeline (returns a job id)",
+            "/jobs": "Recent pipeline jobs",
+            "/jobs/{job_id}": "Job status, stage progress and recent log lines",
+            "/jobs/{job_id}/events": "Server-sent stage progress events",
+            "/headlines": "Scored headlines filtered by ticker, provider, sentiment and date range (cursor paginated)",
+            "/headlines/aggregates": "Headline counts per ticker or per day, split by sentiment",
+            "/score": "FinBERT sentiment for ad-hoc headlines (GET ?headline= or POST {headlines: [...]})",
+            "/score/stats": "Scoring queue depth, batch-size histogram and latency percentiles",
             "/hello": "Test route"
         }
     }
 
 @app.get("/status")
 def status():
-    return {"status": "✅ Service is up!"}
+    running = [job.id for job in jobs.recent() if job.status == "running"]
+    return {"status": "✅ Service is up!", "models_loaded": model_registry.loaded_models(), "running_jobs": running}
 
 @app.get("/hello")
 def hello():
@@ -24,12 +71,90 @@ def hello():
 
 @app.get("/run")
 def run_main():
+    # Returns immediately; a trigger while a run is already queued joins that run
+    job, coalesced = jobs.submit("pipeline")
+    return {"status": job.status, "job_id": job.id, "coalesced": coalesced}
+
+@app.get("/jobs")
+def list_jobs():
+    return [job.to_dict(tail=0) for job in jobs.recent()]
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str, tail: int = 50):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return job.to_dict(tail=tail)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, cursor: int = 0):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+
+    async def stream():
+        position = cursor
+        while True:
+            finished = job.done  # checked first: a finished job has already emitted its last event
+            events, position = job.events_since(position)
+            for event in events:
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            if finished:
+                break
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+@app.get("/headlines")
+def query_headlines(request: Request, ticker: str = None, provider: str = None, sentiment: str = None,
+                    date_from: str = None, date_to: str = None, cursor: int = None, limit: int = 100):
+    headlines.refresh()
     try:
-        result = subprocess.run(["python", "main.py"], capture_output=True, text=True)
-        return {
-            "status": "success" if result.returncode == 0 else "error",
-            "stdout": result.stdout,
-            "stderr": result.stderr
-        }
-    except Exception as e:
-        return {"status": "exception", "error": str(e)}
+        payload = headlines.query(cursor=cursor, limit=limit, ticker=ticker, provider=provider, sentiment=sentiment,
+                                  date_from=date_from, date_to=date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return conditional(request, payload)
+
+@app.get("/headlines/aggregates")
+def aggregate_headlines(request: Request, group_by: str = "ticker", ticker: str = None, provider: str = None,
+                        sentiment: str = None, date_from: str = None, date_to: str = None):
+    headlines.refresh()
+    try:
+        payload = headlines.aggregate(group_by=group_by, ticker=ticker, provider=provider, sentiment=sentiment,
+                                      date_from=date_from, date_to=date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return conditional(request, payload)
+
+async def score_texts(texts):
+    if not texts:
+        raise HTTPException(status_code=400, detail="Provide 'headline' or 'headlines'")
+    if len(texts) > MAX_SCORE_HEADLINES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_SCORE_HEADLINES} headlines per request")
+    futures = []
+    try:
+        for text in texts:
+            futures.append(scorer.submit(text))
+        results = await asyncio.wait_for(asyncio.gather(*(asyncio.wrap_future(f) for f in futures)), REQUEST_TIMEOUT)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Scoring took longer than {REQUEST_TIMEOUT:.0f}s")
+    finally:
+        # Whatever is still queued is no longer wanted (rejected, timed out or client gone)
+        for future in futures:
+            future.cancel()
+    return {"results": [dict(result, headline=text) for text, result in zip(texts, results)]}
+
+@app.get("/score")
+async def score_get(headline: str):
+    return await score_texts([headline])
+
+@app.post("/score")
+async def score_post(request: ScoreRequest):
+    return await score_texts(([request.headline] if request.headline else []) + (request.headlines or []))
+
+@app.get("/score/stats")
+def score_stats():
+    return scorer.stats()
@@ -0,0 +1,177 @@
+import os
+import bisect
+import threading
+from collections import defaultdict, Counter
+from mergers.all_news_merged import OUTPUT_FILE, MERGED_DATASET
+from pipeline import columnar_store, watermarks
+from pipeline.columnar_store import parse_dates, parse_tickers
+
+# 🔧 Configuration
+MAX_LIMIT = 500
+LOAD_CHUNK_ROWS = 5000  # CSV rows parsed at a time while (re)loading
+COLUMNS = ["date", "provider", "headline", "tickers", "sentiment"]
+
+def parse_day(value):
+    # Date filters take the same formats as the CSVs ("2025-07-15", "Jul-15-2025"); rows are keyed on ISO dates
+    if not value:
+        return None
+    day = parse_dates([value])[0]
+    if day is None or day != day:
+        raise ValueError(f"Unrecognised date {value!r}, expected YYYY-MM-DD or Mon-DD-YYYY")
+    return day.isoformat()
+
+class HeadlineIndex:
+    # In-memory posting lists over the merged sentiment CSV; rows keep their file order as ids.
+    # With COLUMNAR_STORE=1 it loads the merged columnar dataset instead (typed dates, only the needed columns)
+    def __init__(self, path=OUTPUT_FILE, columnar=columnar_store.COLUMNAR_STORE, dataset=MERGED_DATASET):
+        self.path = path
+        self.columnar = columnar
+        self.dataset = dataset
+        self.lock = threading.RLock()
+        self.generation = 0  # never reset: a rewrite must not reuse an earlier version (and ETag)
+        self._reset()
+
+    def _reset(self):
+        self.rows = []
+        self.by_ticker = defaultdict(list)
+        self.by_provider = defaultdict(list)
+        self.by_sentiment = defaultdict(list)
+        self.by_date = []  # sorted (date, row id)
+        self.mark = None  # watermarks.file_mark of the CSV up to the last loaded row
+        self.stat = None
+        self.files = set()
+
+    @property
+    def version(self):
+        return f"{self.generation}-{len(self.rows)}"
+
+    def refresh(self):
+        # Cheap when nothing changed (one stat); appends are parsed from the last offset only
+        if self.columnar:
+            return self._refresh_columnar()
+        if not os.path.exists(self.path):
+            return False
+        stat = os.stat(self.path)
+        with self.lock:
+            if self.stat == (stat.st_size, stat.st_mtime_ns):
+                return False
+            # Same append-vs-rewrite check the pipeline stages use for their inputs
+            start, end = watermarks.appended_since(self.path, self.mark, "headline index")
+            appended = start > 0
+            if not appended:
+                self._reset()
+            for chunk, _ in watermarks.iter_csv_chunks(self.path, start, end, LOAD_CHUNK_ROWS):
+                self._add(chunk)
+            self.by_date.sort()
+            self.mark = watermarks.file_mark(self.path, end)
+            self.stat = (stat.st_size, stat.st_mtime_ns)
+            self.generation += 1
+            print(f"📇 Headline index {'extended' if appended else 'loaded'}: {len(self.rows)} rows (v{self.version})")
+            return True
+
+    def _refresh_columnar(self):
+        # One stat of the manifest when nothing changed. Appends only add fragments; a fragment that
+        # disappeared means the dataset was rebuilt or compacted
+        try:
+            stat = os.stat(columnar_store.manifest_path(self.dataset))
+        except FileNotFoundError:
+            return False
+        with self.lock:
+            if self.stat == (stat.st_size, stat.st_mtime_ns):
+                return False
+            listed = columnar_store.dataset_files(self.dataset)
+            files = set(listed)
+            appended = bool(self.files) and self.files < files
+            if not appended:
+                self._reset()
+            new_files = [f for f in listed if f not in self.files]  # manifest order is write order
+            if new_files:
+                frame = columnar_store.read_frame(self.dataset, columns=COLUMNS, files=new_files)
+                self._add(frame, dates=frame["date"])
+            self.by_date.sort()
+            self.files = files
+            self.stat = (stat.st_size, stat.st_mtime_ns)
+            self.generation += 1
+            print(f"📇 Headline index {'extended' if appended else 'loaded'} from columnar store: {len(self.rows)} rows (v{self.version})")
+            return True
+
+    def _add(self, chunk, dates=None):
+        if dates is None:
+            dates = parse_dates(chunk["date"]) if "date" in chunk else [None] * len(chunk)
+        for row, day in zip(chunk.to_dict("records"), dates):
+            row_id = len(self.rows)
+            day = day.isoformat() if day is not None and day == day else None
+            provider = row.get("provider") if isinstance(row.get("provider"), str) else ""
+            sentiment = row.get("sentiment") if isinstance(row.get("sentiment"), str) else ""
+            tickers = [t.upper() for t in parse_tickers(row.get("tickers"))]
+            self.rows.append({
+                "id": row_id,
+                "date": day,
+                "provider": provider,
+                "headline": row.get("headline") if isinstance(row.get("headline"), str) else "",
+                "tickers": tickers,
+                "sentiment": sentiment,
+            })
+            for ticker in set(tickers):
+                self.by_ticker[ticker].append(row_id)
+            self.by_provider[provider.casefold()].append(row_id)
+            self.by_sentiment[sentiment.casefold()].append(row_id)
+            if day:
+                self.by_date.append((day, row_id))
+
+    def _match_ids(self, ticker=None, provider=None, sentiment=None, date_from=None, date_to=None):
+        # Intersect the posting lists that apply, smallest first
+        postings = []
+        if ticker:
+            postings.append(self.by_ticker.get(ticker.upper(), []))
+        if provider:
+            postings.append(self.by_provider.get(provider.casefold(), []))
+        if sentiment:
+            postings.append(self.by_sentiment.get(sentiment.casefold(), []))
+        date_from, date_to = parse_day(date_from), parse_day(date_to)
+        if date_from or date_to:
+            lo = bisect.bisect_left(self.by_date, (date_from or "",))
+            hi = bisect.bisect_right(self.by_date, (date_to or "9999-12-31", float("inf")))
+            postings.append(sorted(row_id for _, row_id in self.by_date[lo:hi]))
+        if not postings:
+            return range(len(self.rows))
+
+        postings.sort(key=len)
+        ids = postings[0]
+        for other in postings[1:]:
+            keep = set(other)
+            ids = [row_id for row_id in ids if row_id in keep]
+        return ids
+
+    def query(self, cursor=None, limit=100, **filters):
+        # cursor = id of the last row of the previous page; ids only grow, so pages stay stable across appends
+        limit = max(1, min(limit, MAX_LIMIT))
+        with self.lock:
+            ids = self._match_ids(**filters)
+            start = bisect.bisect_right(ids, cursor) if cursor is not None else 0
+            page = [self.rows[row_id] for row_id in ids[start:start + limit]]
+            has_more = start + limit < len(ids)
+            return {
+                "items": page,
+                "total": len(ids),
+                "next_cursor": page[-1]["id"] if page and has_more else None,
+                "version": self.version,
+            }
+
+    def aggregate(self, group_by="ticker", **filters):
+        if group_by not in ("ticker", "date"):
+            raise ValueError("group_by must be 'ticker' or 'date'")
+        with self.lock:
+            counts = defaultdict(Counter)
+            for row_id in self._match_ids(**filters):
+                row = self.rows[row_id]
+                keys = row["tickers"] if group_by == "ticker" else [row["date"]]
+                for key in keys:
+                    if key:
+                        counts[key][row["sentiment"] or "Unknown"] += 1
+            groups = [
+                {group_by: key, "count": sum(c.values()), "sentiment": dict(c)}
+                for key, c in counts.items()
+            ]
+            groups.sort(key=lambda g: (-g["count"], g[group_by]) if group_by == "ticker" else g[group_by])
+            return {"group_by": group_by, "groups": groups, "version": self.version}
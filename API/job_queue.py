@@ -0,0 +1,185 @@
+import os
+import sys
+import time
+import uuid
+import queue
+import threading
+import traceback
+import contextvars
+from collections import deque, OrderedDict
+
+# 🔧 Configuration
+LOG_LINES = int(os.getenv("JOB_LOG_LINES", "500"))  # stdout lines kept per job
+LOG_LINE_CHARS = 2000  # longer lines are cut, so the buffer is bounded in bytes as well as lines
+MAX_EVENTS = 1000  # stage events kept per job for SSE replay
+MAX_JOBS = 20      # finished jobs kept for polling
+
+# The job whose output the current thread produces; stage threads inherit it through copy_context()
+current_job = contextvars.ContextVar("current_job", default=None)
+
+class Job:
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.stages = {}
+        self.logs = deque(maxlen=LOG_LINES)
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.event_count = 0  # total events ever emitted; SSE cursors survive the deque dropping old ones
+        self.lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.status in ("succeeded", "failed")
+
+    def emit(self, event, status=None):
+        # A status change and its event land together, so a finished job always has its final event
+        with self.lock:
+            if status is not None:
+                self.status = status
+            event = dict(event, seq=self.event_count, time=time.time())
+            self.events.append(event)
+            self.event_count += 1
+
+    def events_since(self, cursor):
+        with self.lock:
+            first = self.event_count - len(self.events)
+            return [e for e in self.events if e["seq"] >= max(cursor, first)], self.event_count
+
+    def to_dict(self, tail=50):
+        with self.lock:
+            logs = list(self.logs)[-tail:] if tail else []
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "stages": dict(self.stages),
+                "error": self.error,
+                "logs": logs,
+            }
+
+def _last_redraw(text):
+    # Progress bars (tqdm) redraw one line with "\r": keep only what ends up on screen
+    text = text.rstrip("\r")
+    return text[text.rfind("\r") + 1:][:LOG_LINE_CHARS]
+
+class _JobLog:
+    # Installed over sys.stdout / sys.stderr: every write reaches the real stream, and writes made
+    # inside a job's context are also kept in that job's bounded log (other API threads are not)
+    def __init__(self, stream):
+        self.stream = stream
+        self.partial = {}  # job id -> unterminated line, guarded by that job's lock
+
+    def write(self, text):
+        self.stream.write(text)
+        job = current_job.get()
+        if job is not None:
+            with job.lock:
+                *lines, rest = (self.partial.get(job.id, "") + text).split("\n")
+                job.logs.extend(_last_redraw(line) for line in lines)
+                self.partial[job.id] = _last_redraw(rest)
+        return len(text)
+
+    def finish(self, job):
+        with job.lock:
+            rest = self.partial.pop(job.id, "")
+            if rest:
+                job.logs.append(rest)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        # isatty(), encoding, fileno() etc. come from the wrapped stream
+        return getattr(self.stream, name)
+
+def _install_logs():
+    if not isinstance(sys.stdout, _JobLog):
+        sys.stdout = _JobLog(sys.stdout)
+    if not isinstance(sys.stderr, _JobLog):
+        sys.stderr = _JobLog(sys.stderr)
+    return sys.stdout, sys.stderr
+
+class JobQueue:
+    # One background worker; duplicate triggers while a job is queued share that job
+    def __init__(self, runners):
+        self.runners = runners  # kind -> callable(on_event)
+        self.jobs = OrderedDict()
+        self.pending = {}
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.on_finish = []  # callbacks(job), e.g. notifications
+        self.logs = _install_logs()
+        threading.Thread(target=self._worker, name="job-queue", daemon=True).start()
+
+    def submit(self, kind):
+        if kind not in self.runners:
+            raise ValueError(f"Unknown job kind {kind!r}")
+        with self.lock:
+            queued = self.pending.get(kind)
+            if queued is not None:
+                return queued, True
+            job = Job(kind)
+            self.jobs[job.id] = job
+            self.pending[kind] = job
+            self._trim()
+        self.queue.put(job)
+        return job, False
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def recent(self):
+        with self.lock:
+            return list(reversed(self.jobs.values()))
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - MAX_JOBS)]:
+            del self.jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job = self.queue.get()
+            with self.lock:
+                # Triggers arriving from now on queue a fresh job that will see this run's output
+                self.pending.pop(job.kind, None)
+            self._run(job)
+
+    def _run(self, job):
+        def on_event(name, status, elapsed=0.0):
+            with job.lock:
+                job.stages[name] = status
+            job.emit({"type": "stage", "stage": name, "status": status, "elapsed": round(elapsed, 3)})
+
+        job.started_at = time.time()
+        job.emit({"type": "job", "status": "running"}, status="running")
+        token = current_job.set(job)
+        try:
+            self.runners[job.kind](on_event)
+            status = "succeeded"
+        except Exception as e:
+            job.error = str(e)
+            with job.lock:
+                job.logs.extend(traceback.format_exc().splitlines())
+            status = "failed"
+        finally:
+            current_job.reset(token)
+        for log in self.logs:
+            log.finish(job)
+        job.finished_at = time.time()
+        job.emit({"type": "job", "status": status, "error": job.error}, status=status)
+
+        for callback in self.on_finish:
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"⚠️ Job completion callback failed: {e!r}")
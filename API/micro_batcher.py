@@ -0,0 +1,107 @@
+import os
+import time
+import queue
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future
+from sentiments.llm_client import latency_summary
+
+# 🔧 Configuration
+MAX_BATCH = int(os.getenv("SCORE_MAX_BATCH", "32"))
+MAX_WAIT_MS = float(os.getenv("SCORE_MAX_WAIT_MS", "10"))  # how long the first request waits for company
+MAX_QUEUE = int(os.getenv("SCORE_MAX_QUEUE", "1000"))
+REQUEST_TIMEOUT = float(os.getenv("SCORE_TIMEOUT_SECONDS", "30"))  # server-side cap on one /score request
+LATENCY_WINDOW = 1000  # recent request latencies kept for percentiles
+
+class QueueFull(Exception):
+    pass
+
+def _bucket(size):
+    # Power-of-two histogram buckets: 1, 2, 4, 8, ...
+    bucket = 1
+    while bucket < size:
+        bucket *= 2
+    return bucket
+
+class MicroBatcher:
+    # Requests wait up to MAX_WAIT_MS to share one forward pass of at most MAX_BATCH headlines
+    def __init__(self, score_fn, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, max_queue=MAX_QUEUE):
+        self.score_fn = score_fn  # list of texts -> (labels, probs)
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.batch_sizes = Counter()
+        self.queue_depths = Counter()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.batches = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self._worker, name="score-batcher", daemon=True).start()
+
+    def submit(self, text):
+        future = Future()
+        try:
+            self.queue.put_nowait((text, future, time.perf_counter()))
+        except queue.Full:
+            raise QueueFull(f"Scoring queue is full ({self.queue.maxsize} pending)")
+        return future
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect()
+            depth = self.queue.qsize()
+            # Requests cancelled while queued (client gone, timeout) are dropped before scoring
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            texts = [text for text, _, _ in batch]
+            try:
+                labels, probs = self.score_fn(texts)
+                outcomes = [({"sentiment": label, "probs": p}, None) for label, p in zip(labels, probs)]
+            except Exception as e:
+                outcomes = [(None, e)] * len(batch)
+            for (_, future, _), (result, error) in zip(batch, outcomes):
+                try:
+                    if error is None:
+                        future.set_result(result)
+                    else:
+                        future.set_exception(error)
+                except Exception as e:
+                    # Never let one request's future stop the worker
+                    print(f"⚠️ Could not deliver a /score result: {e!r}")
+
+            now = time.perf_counter()
+            with self.lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self.batch_sizes[_bucket(len(batch))] += 1
+                self.queue_depths[_bucket(depth) if depth else 0] += 1
+                self.latencies.extend(now - queued_at for _, _, queued_at in batch)
+
+    def stats(self):
+        with self.lock:
+            latency = latency_summary(self.latencies)
+            return {
+                "queue_depth": self.queue.qsize(),
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self.batches,
+                "requests": self.requests,
+                "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "batch_size_histogram": {f"<={k}": v for k, v in sorted(self.batch_sizes.items())},
+                "queue_depth_histogram": {f"<={k}": v for k, v in sorted(self.queue_depths.items())},
+                "latency_ms": {k: round(v * 1000, 2) if k != "count" else v for k, v in latency.items()},
+            }
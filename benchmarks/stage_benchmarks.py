@@ -0,0 +1,324 @@
+import os
+import re
+import csv
+import sys
+import json
+import time
+import random
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import threading
+import contextlib
+import importlib.util
+from collections import Counter
+
+# 🔧 Configuration
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(REPO_ROOT, "data")
+BASELINE_FILE = os.path.join(REPO_ROOT, "benchmarks", "baselines.json")
+SCALES = (1, 10, 100)
+REPEATS = int(os.getenv("BENCH_REPEATS", "3"))  # best-of-N damps scheduler noise
+MAX_SLOWDOWN = float(os.getenv("BENCH_MAX_SLOWDOWN", "1.3"))  # fail when slower than baseline x this
+MIN_REGRESSION_SECONDS = 0.05  # ignore slowdowns smaller than this (timer noise on tiny stages)
+STUB_LATENCY_MS = float(os.getenv("BENCH_STUB_LATENCY_MS", "20"))
+STAND_IN_VOCAB = 5000
+
+# The LLM stage should measure our client against the stub, not the production rate limit
+os.environ.setdefault("LLM_RATE_PER_SEC", "100000")
+os.environ.setdefault("LLM_CONCURRENCY", "32")
+
+# Fixture files copied into every synthetic tree: path -> how to find the headline in a record
+FIXTURES = {
+    "raw/tradingview_news.txt": ("line", re.compile(r"^(\[[^\]]+\] \(.*?\) )(.+)$")),
+    "raw/finviz_market_news.txt": ("line", re.compile(r"^(\w{3}-\d{2}-\d{4},\s[^,]+,\s)(.+)$")),
+    "processed/finviz_stock_news.csv": ("csv", "headline"),
+    "processed/finviz_tradingview_merged.csv": ("csv", "headline"),
+    "sentiment_encoded/finviz_sentiment_stock_news.csv": ("csv", "headline"),
+    "sentiment_encoded/finviz_sentiment_tradingview.csv": ("csv", "headline"),
+    "merged/finviz_tradingview_merged.csv": ("csv", "headline"),
+    "converted_jsonl/converted.jsonl": ("jsonl", "input"),
+    "cleaned_jsonl/final_cleaned.jsonl": ("jsonl", "input"),
+}
+REFERENCE_FILES = ["reference/symbol_universe.csv"]
+
+# --- Synthetic inputs ---
+
+def variant(headline, copy):
+    # Copy 0 is the fixture itself; later copies reorder the words so they are neither exact nor near duplicates.
+    # The first word stays put so "SYMBOL:" prefixes still resolve.
+    if copy == 0:
+        return headline
+    words = headline.split()
+    rest = words[1:]
+    random.Random(f"{copy}:{headline}").shuffle(rest)
+    return " ".join(words[:1] + rest + [f"#{copy}"])
+
+def scale_fixture(src, dst, kind, field, scale):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    records = 0
+    if kind == "line":
+        with open(src, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        with open(dst, "w", encoding="utf-8") as out:
+            for copy in range(scale):
+                for line in lines:
+                    match = field.match(line)
+                    if match:
+                        out.write(match.group(1) + variant(match.group(2), copy) + "\n")
+                        records += 1
+                    elif copy == 0:
+                        out.write(line + "\n")
+    elif kind == "csv":
+        with open(src, "r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            columns, rows = reader.fieldnames, list(reader)
+        with open(dst, "w", encoding="utf-8", newline="") as out:
+            writer = csv.DictWriter(out, fieldnames=columns)
+            writer.writeheader()
+            for copy in range(scale):
+                for row in rows:
+                    writer.writerow(dict(row, **{field: variant(row[field] or "", copy)}))
+                    records += 1
+    else:
+        with open(src, "r", encoding="utf-8") as f:
+            items = [json.loads(line) for line in f if line.strip()]
+        with open(dst, "w", encoding="utf-8") as out:
+            for copy in range(scale):
+                for item in items:
+                    out.write(json.dumps(dict(item, **{field: variant(item.get(field, ""), copy)}), ensure_ascii=False) + "\n")
+                    records += 1
+    return records
+
+def build_inputs(root, scale):
+    # One data/ tree per scale; every timed run works on a fresh copy of it
+    records = {}
+    for path, (kind, field) in FIXTURES.items():
+        records[path] = scale_fixture(os.path.join(FIXTURE_DIR, path), os.path.join(root, "data", path), kind, field, scale)
+    for path in REFERENCE_FILES:
+        os.makedirs(os.path.dirname(os.path.join(root, "data", path)), exist_ok=True)
+        shutil.copy(os.path.join(FIXTURE_DIR, path), os.path.join(root, "data", path))
+    return records
+
+# --- Local stand-ins for the external dependencies ---
+
+def stand_in_models_available():
+    return importlib.util.find_spec("torch") is not None and importlib.util.find_spec("transformers") is not None
+
+_stand_in = None
+
+def install_stand_in_models():
+    # Tiny randomly initialised BERTs with the real tokenizer/pipeline code paths, so the stages run offline.
+    # They are placed in the model registry under the names the stages ask for.
+    global _stand_in
+    if _stand_in is not None:
+        return
+    import torch
+    from transformers import BertConfig, BertTokenizerFast, BertForSequenceClassification, BertForTokenClassification, pipeline
+    from sentiments import model_registry
+
+    words = Counter()
+    for path in ("processed/finviz_stock_news.csv", "processed/finviz_tradingview_merged.csv"):
+        with open(os.path.join(FIXTURE_DIR, path), "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                words.update(re.findall(r"\w+|[^\w\s]", (row["headline"] or "").lower()))
+    vocab_dir = tempfile.mkdtemp(prefix="bench-vocab-")
+    vocab_file = os.path.join(vocab_dir, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + [w for w, _ in words.most_common(STAND_IN_VOCAB)]) + "\n")
+    tokenizer = BertTokenizerFast(vocab_file=vocab_file)
+
+    torch.manual_seed(0)
+    size = dict(vocab_size=tokenizer.vocab_size, hidden_size=64, num_hidden_layers=2, num_attention_heads=2, intermediate_size=128)
+    finbert = BertForSequenceClassification(BertConfig(num_labels=3, **size)).eval()
+    ner_labels = {0: "O", 1: "B-ORG", 2: "I-ORG"}
+    ner_model = BertForTokenClassification(BertConfig(id2label=ner_labels, label2id={v: k for k, v in ner_labels.items()}, **size)).eval()
+    ner = pipeline("ner", model=ner_model, tokenizer=tokenizer, grouped_entities=True)
+
+    model_registry._models[f"{model_registry.FINBERT_MODEL}:{model_registry.INFERENCE_BACKEND}"] = (tokenizer, finbert)
+    model_registry._models[f"{model_registry.NER_MODEL}:{model_registry.INFERENCE_BACKEND}"] = ner
+    _stand_in = True
+
+@contextlib.contextmanager
+def stub_llm_server(latency_ms=STUB_LATENCY_MS):
+    # OpenAI-style chat completions endpoint on localhost with a fixed response delay
+    from aiohttp import web
+
+    async def complete(request):
+        await request.json()
+        await asyncio.sleep(latency_ms / 1000)
+        return web.json_response({"choices": [{"message": {"content": "Sentiment: Neutral\nReason: Benchmark stub."}}]})
+
+    loop = asyncio.new_event_loop()
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", complete)
+    runner = web.AppRunner(app, access_log=None)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    thread = threading.Thread(target=loop.run_forever, name="llm-stub", daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{port}/v1/chat/completions"
+    finally:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+# --- Stages (each runs with the synthetic tree as its working directory) ---
+
+def run_parse_and_merge_news():
+    from mergers.finviz_tradingview_csv_merger import parse_and_merge_news
+    parse_and_merge_news(incremental=False)
+
+def run_merge_csv_files():
+    from mergers.all_news_merged import merge_csv_files
+    merge_csv_files(incremental=False)
+
+def run_clean_jsonl():
+    from sentiments import jsonl_cleaner
+    os.remove(jsonl_cleaner.OUTPUT_FILE)  # clean_jsonl appends; start from an empty output
+    jsonl_cleaner.clean_jsonl(jsonl_cleaner.INPUT_FILE, jsonl_cleaner.OUTPUT_FILE, jsonl_cleaner.TARGET_TEXT, incremental=False)
+
+def run_shuffler():
+    from sentiments import jsonl_cleaner
+    jsonl_cleaner.shuffler(jsonl_cleaner.OUTPUT_FILE, jsonl_cleaner.SHUFFLED_OUTPUT_FILE)
+
+def run_stock_sentiment():
+    from sentiments.finviz_stocknews_sentiment import finviz_stock_sentiment
+    finviz_stock_sentiment(incremental=False)
+
+def run_tradingview_sentiment():
+    from sentiments.finviz_tradingview_sentiment import finviz_tradingview_sentiment
+    finviz_tradingview_sentiment(incremental=False)
+
+def run_csv_to_json():
+    from sentiments import csv_jsonl_converter
+    csv_jsonl_converter.csv_to_json(incremental=False)
+
+# name -> (runner, module imported before timing, input fixtures counted for rows/s, needs)
+STAGES = {
+    "parse_and_merge_news": (run_parse_and_merge_news, "mergers.finviz_tradingview_csv_merger",
+                             ["raw/tradingview_news.txt", "raw/finviz_market_news.txt"], None),
+    "merge_csv_files": (run_merge_csv_files, "mergers.all_news_merged",
+                        ["sentiment_encoded/finviz_sentiment_stock_news.csv", "sentiment_encoded/finviz_sentiment_tradingview.csv"], None),
+    "clean_jsonl": (run_clean_jsonl, "sentiments.jsonl_cleaner", ["converted_jsonl/converted.jsonl"], None),
+    "shuffler": (run_shuffler, "sentiments.jsonl_cleaner", ["cleaned_jsonl/final_cleaned.jsonl"], None),
+    "finviz_stock_sentiment": (run_stock_sentiment, "sentiments.finviz_stocknews_sentiment", ["processed/finviz_stock_news.csv"], "models"),
+    "finviz_tradingview_sentiment": (run_tradingview_sentiment, "sentiments.finviz_tradingview_sentiment",
+                                     ["processed/finviz_tradingview_merged.csv"], "models"),
+    "csv_to_json": (run_csv_to_json, "sentiments.csv_jsonl_converter", ["merged/finviz_tradingview_merged.csv"], "llm_stub"),
+}
+
+def time_stage(runner, template, repeats):
+    best = None
+    cwd = os.getcwd()
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory(prefix="bench-run-") as workdir:
+            shutil.copytree(os.path.join(template, "data"), os.path.join(workdir, "data"))
+            os.chdir(workdir)
+            try:
+                with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+                    start = time.perf_counter()
+                    runner()
+                    elapsed = time.perf_counter() - start
+            finally:
+                os.chdir(cwd)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+# --- Baselines ---
+
+def load_baselines(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+def save_baselines(results, path=BASELINE_FILE):
+    baselines = load_baselines(path)
+    baselines.update(results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+            "results": dict(sorted(baselines.items())),
+        }, f, indent=2)
+        f.write("\n")
+    print(f"💾 Baselines saved to {path}")
+
+def compare(seconds, baseline):
+    # Returns (ratio, regressed); tiny absolute differences never count as regressions
+    if not baseline:
+        return None, False
+    ratio = seconds / max(baseline["seconds"], 1e-9)
+    return ratio, ratio > MAX_SLOWDOWN and seconds - baseline["seconds"] > MIN_REGRESSION_SECONDS
+
+def run_benchmarks(stages=None, scales=SCALES, repeats=REPEATS, update_baseline=False):
+    stages = list(stages or STAGES)
+    baselines = load_baselines()
+    results = {}
+    regressions = []
+
+    with contextlib.ExitStack() as stack:
+        needs = {STAGES[name][3] for name in stages}
+        if "llm_stub" in needs:
+            from sentiments import csv_jsonl_converter
+            csv_jsonl_converter.API_URL = stack.enter_context(stub_llm_server())
+        if "models" in needs:
+            if stand_in_models_available():
+                install_stand_in_models()
+            else:
+                print("⏭️ torch/transformers not installed: skipping the sentiment stages.")
+                stages = [name for name in stages if STAGES[name][3] != "models"]
+        for name in stages:
+            importlib.import_module(STAGES[name][1])  # import time is not stage time
+
+        for scale in scales:
+            with tempfile.TemporaryDirectory(prefix=f"bench-{scale}x-") as template:
+                records = build_inputs(template, scale)
+                print(f"\n📦 {scale}x inputs ({sum(records.values())} records)")
+                for name in stages:
+                    runner, _, inputs, _ = STAGES[name]
+                    rows = sum(records[path] for path in inputs)
+                    seconds = time_stage(runner, template, repeats)
+                    key = f"{name}@{scale}x"
+                    results[key] = {"seconds": round(seconds, 4), "rows": rows}
+
+                    ratio, regressed = compare(seconds, baselines.get(key))
+                    versus = f"{ratio:.2f}x baseline" if ratio is not None else "no baseline"
+                    print(f"{'❌' if regressed else '⏱️'} {name:<30} {rows:>8} rows {seconds:9.3f}s "
+                          f"{rows / max(seconds, 1e-9):>10.0f} rows/s  ({versus})")
+                    if regressed:
+                        regressions.append(key)
+
+    if update_baseline:
+        save_baselines(results)
+    elif regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {MAX_SLOWDOWN:.2f}x baseline: {', '.join(regressions)}")
+    else:
+        print("\n✅ No regressions.")
+    return results, regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the pipeline stages on 1x/10x/100x synthetic copies of the data fixtures.")
+    parser.add_argument("--stages", help=f"comma-separated subset of: {', '.join(STAGES)}")
+    parser.add_argument("--scales", default=",".join(map(str, SCALES)), help="comma-separated multipliers (default: 1,10,100)")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="runs per stage and scale; the fastest counts")
+    parser.add_argument("--update-baseline", action="store_true", help=f"record these timings in {os.path.relpath(BASELINE_FILE, REPO_ROOT)}")
+    args = parser.parse_args()
+    unknown = set(args.stages.split(",")) - set(STAGES) if args.stages else set()
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    sys.path.insert(0, REPO_ROOT)
+    _, regressions = run_benchmarks(
+        stages=args.stages.split(",") if args.stages else None,
+        scales=[int(s) for s in args.scales.split(",")],
+        repeats=args.repeats,
+        update_baseline=args.update_baseline,
+    )
+    sys.exit(1 if regressions and not args.update_baseline else 0)
@@ -1,35 +1,164 @@
-import requests
-import time
 import os
-import telegram
+import json
 import asyncio
+import aiohttp
+import telegram
 
+# 🔧 Configuration
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
-API_URL = "https://your-render-api-url.onrender.com"
+API_URL = os.getenv("API_URL", "http://localhost:10000").rstrip("/")
+POLL_TIMEOUT = 30  # Telegram long-poll; returns as soon as a message arrives
+API_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5)
+EVENTS_TIMEOUT = aiohttp.ClientTimeout(total=None, connect=5, sock_read=300)  # job event streams stay open
+RETRY_SECONDS = 5
+REPORT_ATTEMPTS = 5
+TERMINAL_STATUSES = ("succeeded", "failed")
 
 bot = telegram.Bot(token=BOT_TOKEN)
+background_tasks = set()
+watched_jobs = set()
 
-async def main():
-    print("[🤖] Telegram bot is live on Render!")
-    last_update_id = None
+def spawn(coro):
+    # Keep a reference so the task isn't garbage-collected mid-flight
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+async def api_get(session, path, **params):
+    async with session.get(f"{API_URL}{path}", params=params) as res:
+        res.raise_for_status()
+        return await res.json()
+
+async def api_post(session, path, payload):
+    async with session.post(f"{API_URL}{path}", json=payload) as res:
+        res.raise_for_status()
+        return await res.json()
+
+async def send(text):
+    await bot.send_message(chat_id=CHAT_ID, text=text)
+
+async def send_quietly(text):
+    # For error replies: a failed send is logged, not raised out of the task
+    try:
+        await send(text)
+    except telegram.error.TelegramError as e:
+        print(f"⚠️ Telegram send failed ({e!r}): {text}")
 
+async def wait_for_job(session, job_id):
+    # Follows the job's SSE stream until the job ends (True) or the API forgets it (False);
+    # reconnects from the last event seen
+    cursor = 0
     while True:
-        updates = await bot.get_updates(offset=last_update_id, timeout=10)
+        try:
+            async with session.get(f"{API_URL}/jobs/{job_id}/events", params={"cursor": cursor}, timeout=EVENTS_TIMEOUT) as res:
+                if res.status == 404:
+                    return False
+                res.raise_for_status()
+                async for line in res.content:
+                    line = line.decode("utf-8").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    event = json.loads(line[len("data:"):])
+                    cursor = event["seq"] + 1
+                    if event["type"] == "job" and event["status"] in TERMINAL_STATUSES:
+                        return True
+            # The server also closes the stream when the job is done, so check before reconnecting
+            job = await api_get(session, f"/jobs/{job_id}", tail=0)
+            if job["status"] in TERMINAL_STATUSES:
+                return True
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                return False
+            print(f"⚠️ Event stream for job {job_id} failed ({e!r}), reconnecting...")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"⚠️ Event stream for job {job_id} dropped ({e!r}), reconnecting...")
+        await asyncio.sleep(RETRY_SECONDS)
 
-        for update in updates:
-            last_update_id = update.update_id + 1
+async def watch_job(session, job_id):
+    # Pushes one message when the job finishes
+    if not await wait_for_job(session, job_id):
+        await send(f"⚠️ Lost track of job {job_id} (the API no longer knows it).")
+        return
+    # The summary fetch retries on its own; the job is over, so there is no stream to go back to
+    for attempt in range(REPORT_ATTEMPTS):
+        try:
+            await report_job(session, job_id)
+            return
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"⚠️ Could not fetch the summary of job {job_id} ({e!r}), retry {attempt + 1}/{REPORT_ATTEMPTS}")
+            await asyncio.sleep(RETRY_SECONDS)
+    await send(f"⚠️ Pipeline job {job_id} finished, but its summary could not be fetched.")
+
+async def report_job(session, job_id):
+    job = await api_get(session, f"/jobs/{job_id}", tail=0)
+    elapsed = (job["finished_at"] or 0) - (job["started_at"] or 0)
+    stages = "\n".join(f"• {name}: {status}" for name, status in job["stages"].items())
+    if job["status"] == "succeeded":
+        text = f"✅ Pipeline job {job_id} finished in {elapsed:.0f}s"
+    else:
+        text = f"❌ Pipeline job {job_id} failed after {elapsed:.0f}s: {job['error']}"
+    await send(f"{text}\n{stages}" if stages else text)
+
+async def run_pipeline(session):
+    res = await api_get(session, "/run")
+    note = " (joined the run already queued)" if res.get("coalesced") else ""
+    await send(f"🚀 Pipeline job {res['job_id']} {res['status']}{note}")
+    if res["job_id"] not in watched_jobs:
+        watched_jobs.add(res["job_id"])
+        try:
+            await watch_job(session, res["job_id"])
+        finally:
+            watched_jobs.discard(res["job_id"])
+
+async def score(session, headline):
+    if not headline:
+        await send("Usage: /score <headline>")
+        return
+    res = await api_post(session, "/score", {"headline": headline})
+    result = res["results"][0]
+    await send(f"📰 {headline}\n→ {result['sentiment']} ({max(result['probs']):.0%})")
+
+async def handle(session, text):
+    command, _, arg = text.strip().partition(" ")
+    command = command.lower().split("@")[0]
+    try:
+        if command == "/status":
+            res = await api_get(session, "/status")
+            running = ", ".join(res.get("running_jobs", [])) or "none"
+            await send(f"Status: {res['status']}\nRunning jobs: {running}")
+        elif command == "/run":
+            await run_pipeline(session)
+        elif command == "/score":
+            await score(session, arg.strip())
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        await send_quietly(f"⚠️ API request for {command} failed: {e!r}")
+    except (KeyError, ValueError) as e:
+        print(f"⚠️ Unexpected API response for {command}: {e!r}")
+        await send_quietly(f"⚠️ The API sent an unexpected response to {command}.")
+    except telegram.error.TelegramError as e:
+        print(f"⚠️ Telegram reply for {command} failed: {e!r}")
+
+async def main():
+    print("[🤖] Telegram bot is live on Render!")
+    last_update_id = None
 
-            text = update.message.text.lower()
-            if text == "/status":
-                res = requests.get(f"{API_URL}/status").json()
-                await bot.send_message(chat_id=CHAT_ID, text=f"Status: {res['status']}")
-            elif text == "/run":
-                await bot.send_message(chat_id=CHAT_ID, text="🚀 Running pipeline...")
-                res = requests.get(f"{API_URL}/run").json()
-                await bot.send_message(chat_id=CHAT_ID, text="✅ Done\n" + res.get("stdout", "No output"))
+    # One pooled client for every API call; connections are reused across commands
+    async with aiohttp.ClientSession(timeout=API_TIMEOUT) as session:
+        while True:
+            try:
+                updates = await bot.get_updates(offset=last_update_id, timeout=POLL_TIMEOUT)
+            except telegram.error.TelegramError as e:
+                print(f"⚠️ Telegram polling failed ({e!r}), retrying...")
+                await asyncio.sleep(RETRY_SECONDS)
+                continue
 
-        await asyncio.sleep(3)
+            for update in updates:
+                last_update_id = update.update_id + 1
+                if update.message and update.message.text:
+                    # Every command runs as its own task: a long /run never blocks the next update
+                    spawn(handle(session, update.message.text))
 
 if __name__ == "__main__":
     asyncio.run(main())
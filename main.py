@@ -7,56 +7,54 @@ import sentiments.finviz_tradingview_sentiment as finviz_tradingview_sentiment
 import mergers.all_news_merged as all_news_merger
 import sentiments.csv_jsonl_converter as csv_jsonl_converter
 import sentiments.jsonl_cleaner as jsonl_cleaner
-import time
-
-def run_full_pipeline():
+from pipeline.dag_runner import stage, run_pipeline
+from pipeline.watermarks import INCREMENTAL
+from functools import partial
+
+# 🕸️ Each stage declares the files it reads and writes; the runner derives the order from them
+def build_stages(incremental=INCREMENTAL):
+    inc = {"incremental": incremental}
+    return [
+        # Scrapers have no file inputs, so they always run (in parallel with each other)
+        stage("finviz_stock_scraper", partial(finviz_stock_scraper.finviz_stock_news_scraper, **inc),
+              outputs=["data/raw/finviz_stock_news.txt", "data/processed/finviz_stock_news.csv"]),
+        stage("finviz_market_scraper", finviz_market_scraper.finviz_market_news_scraper,
+              outputs=["data/raw/finviz_market_news.txt"]),
+        stage("tradingview_scraper", tradingview_scraper.scrape_all_tradingview,
+              outputs=["data/raw/tradingview_news.txt"]),
+
+        # Merge the Finviz market and TradingView raw files
+        stage("finviz_tradingview_merge", partial(finviz_tradingview_csv_merger.parse_and_merge_news, **inc),
+              inputs=["data/raw/tradingview_news.txt", "data/raw/finviz_market_news.txt"],
+              outputs=["data/processed/finviz_tradingview_merged.csv"]),
+
+        # Sentiment analysis for both branches
+        stage("finviz_stock_sentiment", partial(finviz_stock_sentiment.finviz_stock_sentiment, **inc),
+              inputs=["data/processed/finviz_stock_news.csv"],
+              outputs=["data/sentiment_encoded/finviz_sentiment_stock_news.csv"]),
+        stage("finviz_tradingview_sentiment", partial(finviz_tradingview_sentiment.finviz_tradingview_sentiment, **inc),
+              inputs=["data/processed/finviz_tradingview_merged.csv"],
+              outputs=["data/sentiment_encoded/finviz_sentiment_tradingview.csv"]),
+
+        # Merge all news, convert to JSONL and clean it
+        stage("all_news_merge", partial(all_news_merger.merge_csv_files, **inc),
+              inputs=["data/sentiment_encoded/finviz_sentiment_stock_news.csv",
+                      "data/sentiment_encoded/finviz_sentiment_tradingview.csv"],
+              outputs=["data/merged/finviz_tradingview_merged.csv"]),
+        stage("csv_to_jsonl", partial(csv_jsonl_converter.csv_to_json, **inc),
+              inputs=["data/merged/finviz_tradingview_merged.csv"],
+              outputs=["data/converted_jsonl/converted.jsonl"]),
+        stage("jsonl_cleaner", partial(jsonl_cleaner.jsonl_cleaner, **inc),
+              inputs=["data/converted_jsonl/converted.jsonl"],
+              outputs=["data/cleaned_jsonl/final_cleaned.jsonl", jsonl_cleaner.SHUFFLED_OUTPUT_FILE]),
+    ]
+
+def run_full_pipeline(force=False, incremental=INCREMENTAL, on_event=None):
     print("main.py file has started")
-    # Run the Finviz stock news scraper
-    finviz_stock_scraper.finviz_stock_news_scraper()
-    print("Finviz stock news scraper completed.")
-    time.sleep(2)
-
-    # Run the Finviz market news scraper
-    finviz_market_scraper.finviz_market_news_scraper()
-    print("Finviz market news scraper completed.")
-    time.sleep(2)
-
-    # Run the TradingView news scraper
-    tradingview_scraper.scrape_all_tradingview()
-    print("TradingView news scraper completed.")
-    time.sleep(2)
-
-    # Run the merger for Finviz and TradingView CSV files
-    finviz_tradingview_csv_merger.parse_and_merge_news()
-    print("Finviz and TradingView CSV merger completed.")
-    time.sleep(2)
-
-    # Run the sentiment analysis for Finviz stock news
-    finviz_stock_sentiment.finviz_stock_sentiment()
-    print("Finviz stock news sentiment analysis completed.")
-    time.sleep(2)
-
-    # Run the sentiment analysis for Finviz TradingView news
-    finviz_tradingview_sentiment.finviz_tradingview_sentiment()
-    print("Finviz TradingView news sentiment analysis completed.")
-    time.sleep(2)
-
-    # Run the merger for all news
-    all_news_merger.merge_csv_files()
-    print("All news merger completed.")
-    time.sleep(2)
-
-    # Convert CSV to JSONL
-    csv_jsonl_converter.csv_to_json()
-    print("CSV to JSONL conversion completed.")
-    time.sleep(2)
-
-    # Clean the JSONL file
-    jsonl_cleaner.jsonl_cleaner()
-    print("jsonl cleaning completed.")
+    if incremental:
+        print("⏩ Incremental mode: only records newer than each stage's watermark are processed.")
+    return run_pipeline(build_stages(incremental), force=force, on_event=on_event)
 
 if __name__ == "__main__":
     run_full_pipeline()
     print("Full pipeline execution completed.")
-
-
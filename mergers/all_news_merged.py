@@ -1,29 +1,112 @@
-import pandas as pd
+import io
 import os
+import csv
+import hashlib
+import pandas as pd
+from itertools import islice
+from pipeline import watermarks, columnar_store
 
-def merge_csv_files():
-    try:
-        file1 = 'data/sentiment_encoded/finviz_sentiment_stock_news.csv'
-        file2 = 'data/sentiment_encoded/finviz_sentiment_tradingview.csv'
+# 🔧 Configuration
+INPUT_FILES = [
+    'data/sentiment_encoded/finviz_sentiment_stock_news.csv',
+    'data/sentiment_encoded/finviz_sentiment_tradingview.csv'
+]
+OUTPUT_FILE = 'data/merged/finviz_tradingview_merged.csv'
+MERGED_DATASET = "merged"  # columnar copy of OUTPUT_FILE (COLUMNAR_STORE=1), read by the API's headline index
+MERGED_SOURCE = "all_news"
+CHUNK_ROWS = 5000
 
-        # Output file path
-        output_file = 'data/merged/finviz_tradingview_merged.csv'
-        df1 = pd.read_csv(file1)
-        df2 = pd.read_csv(file2)
+def row_key(row):
+    # 64-bit key of normalized headline + date: rows that only differ elsewhere are duplicates
+    headline = ' '.join((row.get("headline") or "").split()).casefold()
+    text = f"{(row.get('date') or '').strip()}\x1f{headline}"
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
 
-        merged_df = pd.concat([df1, df2], ignore_index=True)
+def read_header(path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f), [])
 
-        # Optional: Drop duplicates if needed
-        merged_df.drop_duplicates(inplace=True)
+def iter_rows(path, start, end):
+    # Complete rows in the byte range [start, end), CHUNK_ROWS records in memory at a time
+    for header, records, _ in watermarks.iter_csv_records(path, start, end, CHUNK_ROWS):
+        yield from csv.DictReader(io.StringIO((header + b"".join(records)).decode('utf-8'), newline=''))
+
+def merge_csv_files(input_files=None, output_file=OUTPUT_FILE, incremental=watermarks.INCREMENTAL):
+    try:
+        input_files = list(input_files or INPUT_FILES)
+
+        # Output columns: the existing output header, else the union of the input headers in order
+        append = incremental and os.path.exists(output_file) and os.path.getsize(output_file) > 0
+        columns = read_header(output_file) if append else []
+        for path in input_files:
+            columns += [c for c in read_header(path) if c not in columns]
 
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        merged_df.to_csv(output_file, index=False)
+        if not incremental:
+            # Full merge rebuilds the output, so the persisted key set starts over too
+            watermarks.mark_seen("all_news_merged", [], reset=True)
+        seen = set()
+        written = duplicates = 0
+        consumed = {}
+
+        def merged_chunks(writer):
+            # Writes each chunk's new rows to the CSV and yields them (as row dicts) for the columnar copy
+            nonlocal written, duplicates
+            for path in input_files:
+                if incremental:
+                    # Only rows the sentiment stages appended since the last merge
+                    start, consumed[path] = watermarks.appended_range(path, f"merge:{path}")
+                else:
+                    start, consumed[path] = 0, watermarks.complete_end(path)
+                rows = iter_rows(path, start, consumed[path])
 
+                # 🌊 Stream fixed-size chunks: memory is the key set, not the data
+                while True:
+                    chunk = list(islice(rows, CHUNK_ROWS))
+                    if not chunk:
+                        break
+                    keys = [row_key(row) for row in chunk]
+                    if incremental:
+                        # Keys from earlier runs live in the watermark store
+                        fresh = watermarks.unseen_mask("all_news_merged", [str(k) for k in keys])
+                    else:
+                        fresh = [True] * len(keys)
+
+                    kept = []
+                    for row, key, is_fresh in zip(chunk, keys, fresh):
+                        if not is_fresh or key in seen:
+                            duplicates += 1
+                            continue
+                        seen.add(key)
+                        writer.writerow(row)
+                        kept.append(row)
+                        written += 1
+
+                    watermarks.mark_seen("all_news_merged", [str(k) for k in keys])
+                    yield kept
+
+        with open(output_file, 'a' if append else 'w', encoding='utf-8', newline='') as out:
+            writer = csv.DictWriter(out, fieldnames=columns, restval='', extrasaction='ignore')
+            if not append:
+                writer.writeheader()
+            chunks = merged_chunks(writer)
+            if columnar_store.COLUMNAR_STORE:
+                # One columnar write per run; a rebuilt CSV rebuilds its columnar copy as well
+                frames = (pd.DataFrame(kept, columns=columns) for kept in chunks)
+                columnar_store.mirror_frames(frames, MERGED_DATASET, MERGED_SOURCE, append=append)
+            else:
+                for _ in chunks:
+                    pass
+
+        for path, end in consumed.items():
+            watermarks.commit_range(path, f"merge:{path}", end)
+
+        print(f"[📊] Wrote {written} rows, dropped {duplicates} duplicates from {len(input_files)} files")
         print(f"[✅] Merged CSV saved to: {output_file}")
     except Exception as e:
+        # Re-raised so the pipeline marks the stage failed instead of recording a truncated output as done
         print(f"[❌] Error during merge: {e}")
+        raise
 
 if __name__ == "__main__":
     merge_csv_files()
-
-
@@ -1,8 +1,11 @@
 import re
+import io
 import csv
+import os
 from datetime import datetime
+from pipeline import watermarks
 
-def parse_and_merge_news():
+def parse_and_merge_news(incremental=watermarks.INCREMENTAL):
     # File paths
     TXT_FILES = [
         "data/raw/tradingview_news.txt",
@@ -15,36 +18,63 @@ def parse_and_merge_news():
     pattern2 = re.compile(r"^(\w{3}-\d{2}-\d{4}),\s([^,]+),\s(.+)$")
 
     parsed_rows = []
+    consumed = {}
 
     for file_path in TXT_FILES:
-        with open(file_path, "r", encoding="utf-8") as file:
-            for line in file:
-                line = line.strip()
-
-                # Try pattern1
-                match1 = pattern1.match(line)
-                if match1:
-                    try:
-                        raw_date = match1.group(1)
-                        parsed_date = datetime.strptime(raw_date, "%b %d, %Y").strftime("%b-%d-%Y")
-                    except ValueError:
-                        parsed_date = raw_date
-
-                    provider = match1.group(2)
-                    headline = match1.group(3)
-                    parsed_rows.append([parsed_date, provider, headline])
-                    continue
-
-                # Try pattern2
-                match2 = pattern2.match(line)
-                if match2:
-                    date = match2.group(1)
-                    provider = match2.group(2).strip()
-                    headline = match2.group(3)
-                    parsed_rows.append([date, provider, headline])
-                    continue
-
-                print(f"⚠️ Skipping unmatched line: {line}")
+        if incremental:
+            # ⏩ Only the bytes appended since the last run
+            text, consumed[file_path] = watermarks.read_appended_text(file_path, f"parse:{file_path}")
+        else:
+            with open(file_path, "r", encoding="utf-8") as file:
+                text = file.read()
+
+        for line in io.StringIO(text):
+            line = line.strip()
+
+            # Try pattern1
+            match1 = pattern1.match(line)
+            if match1:
+                try:
+                    raw_date = match1.group(1)
+                    parsed_date = datetime.strptime(raw_date, "%b %d, %Y").strftime("%b-%d-%Y")
+                except ValueError:
+                    parsed_date = raw_date
+
+                provider = match1.group(2)
+                headline = match1.group(3)
+                parsed_rows.append([parsed_date, provider, headline])
+                continue
+
+            # Try pattern2
+            match2 = pattern2.match(line)
+            if match2:
+                date = match2.group(1)
+                provider = match2.group(2).strip()
+                headline = match2.group(3)
+                parsed_rows.append([date, provider, headline])
+                continue
+
+            print(f"⚠️ Skipping unmatched line: {line}")
+
+    ids = [watermarks.record_id(date, headline) for date, _, headline in parsed_rows]
+
+    if incremental:
+        # Drop headlines an earlier run already emitted, then append the rest
+        keep = watermarks.unseen_mask("finviz_tradingview_merged", ids)
+        new_rows = [row for row, k in zip(parsed_rows, keep) if k]
+
+        write_header = not os.path.exists(OUTPUT_FILE) or os.path.getsize(OUTPUT_FILE) == 0
+        with open(OUTPUT_FILE, "a", encoding="utf-8", newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            if write_header:
+                writer.writerow(["date", "provider", "headline"])
+            writer.writerows(new_rows)
+
+        watermarks.mark_seen("finviz_tradingview_merged", ids)
+        for file_path, end in consumed.items():
+            watermarks.commit_range(file_path, f"parse:{file_path}", end)
+        print(f"✅ Parsed {len(parsed_rows)} new lines, appended {len(new_rows)} unseen headlines to '{OUTPUT_FILE}'")
+        return
 
     # Save to CSV
     with open(OUTPUT_FILE, "w", encoding="utf-8", newline='') as csvfile:
@@ -52,6 +82,11 @@ def parse_and_merge_news():
         writer.writerow(["date", "provider", "headline"])
         writer.writerows(parsed_rows)
 
+    # A full run resets the watermarks so a later incremental run continues from here
+    watermarks.mark_seen("finviz_tradingview_merged", ids, reset=True)
+    for file_path in TXT_FILES:
+        watermarks.commit_range(file_path, f"parse:{file_path}", watermarks.complete_end(file_path))
+
     print(f"✅ Parsed {len(parsed_rows)} headlines. Saved to '{OUTPUT_FILE}'")
 
 # Example call
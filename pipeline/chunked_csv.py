@@ -0,0 +1,44 @@
+import os
+from pipeline import watermarks
+
+# 🔧 Configuration
+STREAMING = os.getenv("SENTIMENT_STREAMING", "0") == "1"
+CHUNK_ROWS = int(os.getenv("SENTIMENT_CHUNK_ROWS", "1000"))
+
+def stream_csv_stage(input_path, output_path, transform, watermark_name, incremental=watermarks.INCREMENTAL,
+                     chunk_rows=CHUNK_ROWS, progress_path=None):
+    # transform(chunk) -> scored frame, appended to output_path
+    progress_path = progress_path or output_path + ".progress"
+    if incremental:
+        start, end = watermarks.appended_range(input_path, watermark_name)
+        fingerprint = {"path": input_path, "start": start}
+    else:
+        start, end = 0, watermarks.complete_end(input_path)
+        stat = os.stat(input_path)
+        fingerprint = {"path": input_path, "size": stat.st_size, "mtime": stat.st_mtime}
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    progress = watermarks.load_json_state(progress_path, fingerprint)
+    if progress:
+        # ♻️ Rows written after the last saved offset are dropped and scored again
+        with open(output_path, 'a', encoding='utf-8') as f:
+            f.truncate(progress["output_bytes"])
+        print(f"♻️ Resuming {input_path} after {progress['rows_done']} rows (byte {progress['offset']}).")
+    else:
+        if not incremental and os.path.exists(output_path):
+            os.remove(output_path)
+        progress = {"input": fingerprint, "offset": start, "rows_done": 0, "output_bytes": 0}
+
+    for chunk, chunk_end in watermarks.iter_csv_chunks(input_path, progress["offset"], end, chunk_rows):
+        scored = transform(chunk)
+        watermarks.append_csv(scored, output_path)
+
+        progress.update(offset=chunk_end, rows_done=progress["rows_done"] + len(scored),
+                        output_bytes=os.path.getsize(output_path))
+        watermarks.write_json_atomic(progress_path, progress)
+        print(f"🌊 [{watermark_name}] {progress['rows_done']} rows scored (input byte {chunk_end}/{end})")
+
+    watermarks.commit_range(input_path, watermark_name, end)
+    if os.path.exists(progress_path):
+        os.remove(progress_path)
+    return progress["rows_done"]
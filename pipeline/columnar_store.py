@@ -0,0 +1,202 @@
+import os
+import ast
+import json
+import uuid
+import pandas as pd
+from collections import defaultdict
+from pipeline import watermarks
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+except ImportError:  # optional backend: CSV keeps working without pyarrow
+    pa = None
+
+# 🔧 Configuration
+COLUMNAR_STORE = os.getenv("COLUMNAR_STORE", "0") == "1"
+COLUMNAR_ROOT = os.getenv("COLUMNAR_ROOT", "data/columnar")
+COLUMNAR_FORMAT = os.getenv("COLUMNAR_FORMAT", "parquet")  # "parquet" or "ipc" (Arrow IPC / Feather v2)
+PARTITION_COLUMNS = ["date", "source"]
+DATE_FORMATS = ["%Y-%m-%d", "%b-%d-%Y"]
+ROWS_PER_GROUP = 64 * 1024
+COMPACT_AFTER = int(os.getenv("COLUMNAR_COMPACT_AFTER", "8"))  # fragments a partition may collect before it is rewritten as one
+MANIFEST = "_manifest.json"  # the leading "_" keeps it out of pyarrow's file discovery
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("❌ The columnar store needs pyarrow: pip install pyarrow")
+
+def _partitioning():
+    return ds.partitioning(pa.schema([("date", pa.date32()), ("source", pa.string())]), flavor="hive")
+
+def _schema():
+    return pa.schema([
+        ("date", pa.date32()),
+        ("source", pa.string()),
+        ("provider", pa.dictionary(pa.int32(), pa.string())),
+        ("headline", pa.string()),
+        ("tickers", pa.list_(pa.string())),
+        ("sentiment", pa.dictionary(pa.int8(), pa.string())),
+    ])
+
+def parse_tickers(value):
+    # Accepts "AAPL, MSFT", "['AAPL', 'MSFT']" (older Finviz CSVs) or an actual list
+    if not isinstance(value, str) and hasattr(value, "__iter__"):  # lists, or arrays read back from the store
+        return [str(t) for t in value]
+    if not isinstance(value, str) or not value.strip():
+        return []
+    text = value.strip()
+    if text.startswith("["):
+        try:
+            return [str(t) for t in ast.literal_eval(text)]
+        except (ValueError, SyntaxError):
+            text = text.strip("[]")
+    return [t.strip().strip("'\"") for t in text.split(",") if t.strip().strip("'\"")]
+
+def parse_dates(values):
+    values = pd.Series(values, dtype="object").astype("string")
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS:
+        attempt = pd.to_datetime(values, format=fmt, errors="coerce")
+        parsed = parsed.fillna(attempt)
+    return parsed.dt.date
+
+def to_table(df, source):
+    _require_pyarrow()
+    frame = pd.DataFrame({
+        "date": parse_dates(df["date"]) if "date" in df else None,
+        "source": source,
+        "provider": df.get("provider", pd.Series(index=df.index, dtype="object")).fillna("").astype(str),
+        "headline": df["headline"].fillna("").astype(str),
+        "tickers": df.get("tickers", pd.Series(index=df.index, dtype="object")).map(parse_tickers),
+        "sentiment": df.get("sentiment", pd.Series(index=df.index, dtype="object")).astype("string"),
+    })
+    return pa.Table.from_pandas(frame, schema=_schema(), preserve_index=False)
+
+def manifest_path(dataset, root=COLUMNAR_ROOT):
+    # Rewritten after every write; readers stat this one file to learn whether anything changed
+    return os.path.join(root, dataset, MANIFEST)
+
+def _read_manifest(dataset, root):
+    path = manifest_path(dataset, root)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["files"]
+
+def _write_fragments(data, base_dir, fmt):
+    # One dataset write: each partition gets one file, with small input chunks coalesced into full row groups
+    written = []
+    ds.write_dataset(
+        data,
+        base_dir,
+        format=fmt,
+        partitioning=_partitioning(),
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.{'parquet' if fmt == 'parquet' else 'arrow'}",
+        existing_data_behavior="overwrite_or_ignore",
+        min_rows_per_group=ROWS_PER_GROUP,
+        max_rows_per_group=ROWS_PER_GROUP,
+        file_visitor=lambda written_file: written.append(os.path.relpath(written_file.path, base_dir)),
+    )
+    return written
+
+def _source_files(base_dir, source):
+    # Every fragment on disk under a source=<source> partition, manifest or not
+    found = []
+    for dirpath, _, filenames in os.walk(base_dir):
+        if os.path.basename(dirpath) == f"source={source}":
+            found += [os.path.relpath(os.path.join(dirpath, name), base_dir) for name in filenames]
+    return found
+
+def _compact(files, partitions, base_dir, fmt):
+    # Partitions that collected more than COMPACT_AFTER fragments (one per incremental run) are rewritten as one
+    by_partition = defaultdict(list)
+    for path in files:
+        by_partition[os.path.dirname(path)].append(path)
+    stale = []
+    for partition in partitions:
+        fragments = by_partition[partition]
+        if len(fragments) <= COMPACT_AFTER:
+            continue
+        table = ds.dataset([os.path.join(base_dir, f) for f in fragments], schema=_schema(), format=fmt,
+                           partitioning=_partitioning(), partition_base_dir=base_dir).to_table()
+        written = _write_fragments(table, base_dir, fmt)
+        files = [f for f in files if f not in fragments] + written
+        stale += fragments
+    return files, stale
+
+def write_partitioned(frames, dataset, source, append=False, root=COLUMNAR_ROOT, fmt=COLUMNAR_FORMAT):
+    # Streams one DataFrame or an iterable of them into <root>/<dataset>/date=YYYY-MM-DD/source=<source>/
+    # in a single write. The manifest only moves to the new fragments once they are complete, and the
+    # ones they replace are deleted after that.
+    _require_pyarrow()
+    base_dir = os.path.join(root, dataset)
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+    rows = 0
+
+    def batches():
+        nonlocal rows
+        for df in frames:
+            if len(df):
+                rows += len(df)
+                yield from to_table(df, source).to_batches()
+
+    os.makedirs(base_dir, exist_ok=True)
+    written = _write_fragments(pa.RecordBatchReader.from_batches(_schema(), batches()), base_dir, fmt)
+    files = _read_manifest(dataset, root)
+    if append:
+        stale = []
+    else:
+        # A full rewrite replaces every fragment this source owns
+        stale = [f for f in _source_files(base_dir, source) if f not in written]
+        files = [f for f in files if f not in stale]
+    files += [f for f in written if f not in files]
+    files, compacted = _compact(files, {os.path.dirname(f) for f in written}, base_dir, fmt)
+    watermarks.write_json_atomic(manifest_path(dataset, root), {"files": files})
+
+    for path in stale + compacted:
+        os.remove(os.path.join(base_dir, path))
+    for dirpath, dirnames, filenames in os.walk(base_dir, topdown=False):
+        if dirpath != base_dir and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    return rows
+
+def dataset_files(dataset, root=COLUMNAR_ROOT, fmt=COLUMNAR_FORMAT):
+    # Fragment paths in write order; empty when the dataset was never written
+    base_dir = os.path.join(root, dataset)
+    if os.path.exists(manifest_path(dataset, root)):
+        return [os.path.join(base_dir, f) for f in _read_manifest(dataset, root)]
+    if not os.path.isdir(base_dir):
+        return []
+    # Written before the manifest existed: list the directory
+    return ds.dataset(base_dir, format=fmt, partitioning=_partitioning()).files
+
+def open_dataset(dataset, root=COLUMNAR_ROOT, fmt=COLUMNAR_FORMAT, memory_map=True, files=None):
+    # files: restrict the dataset to these fragment paths (e.g. the ones added since the last read);
+    # by default the fragments the manifest lists, so a write in progress is never seen half-done
+    _require_pyarrow()
+    base_dir = os.path.join(root, dataset)
+    filesystem = pafs.LocalFileSystem(use_mmap=memory_map)
+    return ds.dataset(
+        list(dataset_files(dataset, root, fmt) if files is None else files),
+        schema=_schema(),
+        format=fmt,
+        filesystem=filesystem,
+        partitioning=_partitioning(),
+        partition_base_dir=base_dir,
+    )
+
+def read_frame(dataset, columns=None, filter=None, root=COLUMNAR_ROOT, fmt=COLUMNAR_FORMAT, memory_map=True, files=None):
+    # Column projection + partition pruning happen before any data is decoded
+    table = open_dataset(dataset, root, fmt, memory_map, files).to_table(columns=columns, filter=filter)
+    return table.to_pandas()
+
+def mirror_frames(frames, dataset, source, append=False):
+    # A no-op unless COLUMNAR_STORE=1. The columnar copy serves readers such as the API's headline
+    # index; CSV stays the hand-off format between pipeline stages.
+    if not COLUMNAR_STORE:
+        return
+    rows = write_partitioned(frames, dataset, source, append=append)
+    print(f"🧱 Mirrored {rows} rows to columnar dataset '{dataset}' (source={source})")
@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import traceback
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pipeline import watermarks
+
+# 🔧 Configuration
+STATE_FILE = os.getenv("PIPELINE_STATE_FILE", "data/cache/pipeline_state.json")
+MAX_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+
+def stage(name, func, inputs=(), outputs=(), always_run=False):
+    return {
+        "name": name,
+        "func": func,
+        "inputs": list(inputs),
+        "outputs": list(outputs),
+        # Stages without file inputs (scrapers) read the outside world, so they always run
+        "always_run": always_run or not inputs
+    }
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def input_hashes(stage_spec):
+    return {path: file_hash(path) if os.path.exists(path) else None for path in stage_spec["inputs"]}
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(state, path=STATE_FILE):
+    watermarks.write_json_atomic(path, state, indent=2)
+
+def build_dependencies(stages):
+    producers = {}
+    for spec in stages:
+        for output in spec["outputs"]:
+            producers[output] = spec["name"]
+    return {
+        spec["name"]: {producers[i] for i in spec["inputs"] if i in producers and producers[i] != spec["name"]}
+        for spec in stages
+    }
+
+def run_pipeline(stages, max_workers=MAX_WORKERS, force=False, state_file=STATE_FILE, on_event=None):
+    # on_event(stage_name, status, elapsed) is called as stages start, finish, skip, fail or get blocked
+    def notify(name, status, elapsed=0.0):
+        if on_event is not None:
+            on_event(name, status, elapsed)
+
+    by_name = {spec["name"]: spec for spec in stages}
+    deps = build_dependencies(stages)
+    state = load_state(state_file)
+    state_lock = threading.Lock()
+    results = {}
+
+    def run_stage(spec):
+        hashes = input_hashes(spec)
+        previous = state.get(spec["name"], {})
+        unchanged = (
+            not force and
+            not spec["always_run"] and
+            previous.get("inputs") == hashes and
+            all(os.path.exists(o) for o in spec["outputs"])
+        )
+        if unchanged:
+            print(f"⏭️ [{spec['name']}] inputs unchanged since last successful run, skipping.")
+            return "skipped", 0.0
+
+        print(f"▶️ [{spec['name']}] started")
+        notify(spec["name"], "running")
+        start = time.perf_counter()
+        spec["func"]()
+        elapsed = time.perf_counter() - start
+
+        with state_lock:
+            state[spec["name"]] = {"inputs": hashes, "finished_at": time.time()}
+            save_state(state, state_file)
+        print(f"✅ [{spec['name']}] finished in {elapsed:.1f}s")
+        return "done", elapsed
+
+    pending = set(by_name)
+    running = {}
+
+    # 🕸️ Launch every stage whose dependencies have finished; independent branches overlap
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            launched = len(running) + len(results)
+            for name in sorted(pending):
+                upstream = deps[name]
+                if any(results.get(d, ("",))[0] in ("failed", "blocked") for d in upstream):
+                    results[name] = ("blocked", 0.0)
+                    print(f"⛔ [{name}] not run because an upstream stage failed")
+                    notify(name, "blocked")
+                    pending.discard(name)
+                elif all(d in results for d in upstream):
+                    # Each stage runs in a copy of the caller's context (e.g. which API job its output belongs to)
+                    running[pool.submit(contextvars.copy_context().run, run_stage, by_name[name])] = name
+                    pending.discard(name)
+
+            if not running:
+                if pending and len(running) + len(results) == launched:
+                    raise RuntimeError(f"Pipeline has a dependency cycle between: {', '.join(sorted(pending))}")
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = ("failed", 0.0)
+                    print(f"❌ [{name}] failed: {e!r}")
+                    traceback.print_exception(e)
+                notify(name, *results[name])
+
+    failed = [name for name, (status, _) in results.items() if status in ("failed", "blocked")]
+    if failed:
+        raise RuntimeError(f"Pipeline stages did not complete: {', '.join(sorted(failed))}")
+    return results
@@ -0,0 +1,135 @@
+import os
+import sys
+import csv
+import hashlib
+import threading
+import pandas as pd
+from collections import deque
+
+# 🔧 Configuration
+SYMBOL_UNIVERSE = os.getenv("SYMBOL_UNIVERSE", "data/reference/symbol_universe.csv")
+
+_index = None
+_index_lock = threading.Lock()
+
+def _fold(text):
+    # Lowercase without changing string length, so match offsets stay valid on the original text
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+def _is_boundary(text, pos):
+    return pos < 0 or pos >= len(text) or not text[pos].isalnum()
+
+class SymbolIndex:
+    # Aho-Corasick automaton over symbols, names and aliases: one linear pass tags a headline
+    def __init__(self, entries, fingerprint=""):
+        self.fingerprint = fingerprint  # identifies the universe the index was built from (cache keys)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        self.patterns = []  # (pattern, symbol)
+        self.markets = {}
+
+        for entry in entries:
+            symbol = entry["symbol"]
+            self.markets[symbol] = entry.get("market", "")
+            # match_symbol=0 / match_name=0 switch off symbols and names that are ordinary words ("F", "Target")
+            names = (entry.get("aliases") or "").split("|")
+            if str(entry.get("match_name", "1")).strip() != "0":
+                names.insert(0, entry.get("name", ""))
+            if str(entry.get("match_symbol", "1")).strip() != "0":
+                names.insert(0, symbol)
+            for name in names:
+                name = name.strip()
+                if name:
+                    self._add(name, symbol)
+        self._build_failure_links()
+
+    def _add(self, pattern, symbol):
+        state = 0
+        for char in _fold(pattern):
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.out[state].append(len(self.patterns))
+        self.patterns.append((pattern, symbol))
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def matches(self, text):
+        # Yields (start, end, symbol) for whole-word matches, overlapping ones included
+        folded = _fold(text)
+        state = 0
+        for pos, char in enumerate(folded):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for pattern_id in self.out[state]:
+                pattern, symbol = self.patterns[pattern_id]
+                start = pos - len(pattern) + 1
+                # Case-sensitive: as written in the universe, or fully upper-cased for all-caps headlines
+                # ("OPEN" the ticker, not "open" the verb; "Eternal" the company only where the CSV lists it)
+                if text[start:pos + 1] not in (pattern, pattern.upper()):
+                    continue
+                if _is_boundary(text, start - 1) and _is_boundary(text, pos + 1):
+                    yield start, pos + 1, symbol
+
+    def tag(self, text):
+        # Longest match wins where matches overlap ("BTC/USD" over "BTC", "Tata Steel" over "Tata")
+        if not isinstance(text, str) or not text:
+            return []
+        found = sorted(self.matches(text), key=lambda m: (m[0], m[0] - m[1]))
+        symbols = []
+        covered_until = -1
+        for start, end, symbol in found:
+            if start < covered_until:
+                continue
+            covered_until = end
+            if symbol not in symbols:
+                symbols.append(symbol)
+        return sorted(symbols)
+
+def load_symbol_index(path=SYMBOL_UNIVERSE):
+    with open(path, "rb") as f:
+        data = f.read()
+    entries = list(csv.DictReader(data.decode("utf-8").splitlines()))
+    index = SymbolIndex(entries, fingerprint=hashlib.sha1(data).hexdigest()[:12])
+    print(f"🗂️ Loaded {len(entries)} symbols ({len(index.patterns)} patterns) from {path}")
+    return index
+
+def get_symbol_index():
+    # One automaton per process, shared by every scraper and sentiment stage
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_symbol_index()
+    return _index
+
+def tag_tickers(text):
+    return get_symbol_index().tag(text)
+
+def tag_csv(input_csv, text_column="headline", output_csv=None, tickers_column="tickers"):
+    # Retags any headline CSV with the shared index (e.g. google_reddit_news.csv)
+    df = pd.read_csv(input_csv)
+    df[tickers_column] = [", ".join(tag_tickers(t)) for t in df[text_column]]
+    df.to_csv(output_csv or input_csv, index=False)
+    print(f"🏷️ Tagged {int((df[tickers_column] != '').sum())}/{len(df)} rows in {output_csv or input_csv}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m pipeline.symbol_index <csv> [text_column] [output_csv]")
+        sys.exit(1)
+    tag_csv(*sys.argv[1:])
@@ -0,0 +1,187 @@
+import os
+import io
+import json
+import sqlite3
+import hashlib
+import contextlib
+import pandas as pd
+
+# 🔧 Configuration
+INCREMENTAL = os.getenv("PIPELINE_INCREMENTAL", "0") == "1"
+WATERMARK_DB = os.getenv("WATERMARK_DB", "data/cache/watermarks.sqlite")
+TAIL_BYTES = 4096  # bytes before the watermark used to detect a rewritten file
+
+@contextlib.contextmanager
+def _connect(db_path=WATERMARK_DB):
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS watermarks (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS seen_ids (source TEXT NOT NULL, id TEXT NOT NULL, PRIMARY KEY (source, id))")
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+def get_watermark(name, db_path=WATERMARK_DB):
+    with _connect(db_path) as conn:
+        row = conn.execute("SELECT value FROM watermarks WHERE name = ?", (name,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+def set_watermark(name, value, db_path=WATERMARK_DB):
+    with _connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO watermarks (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+            (name, json.dumps(value))
+        )
+
+# --- Headline ids: drop records an earlier run already pushed downstream ---
+
+def record_id(*parts):
+    text = "\x1f".join(' '.join(str(p).strip().split()).casefold() for p in parts)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+def unseen_mask(source, ids, db_path=WATERMARK_DB):
+    # True for ids no earlier run has emitted (first occurrence within this batch only)
+    keep = []
+    batch_seen = set()
+    with _connect(db_path) as conn:
+        for record in ids:
+            if record in batch_seen:
+                keep.append(False)
+                continue
+            batch_seen.add(record)
+            known = conn.execute("SELECT 1 FROM seen_ids WHERE source = ? AND id = ?", (source, record)).fetchone()
+            keep.append(known is None)
+    return keep
+
+def mark_seen(source, ids, reset=False, db_path=WATERMARK_DB):
+    with _connect(db_path) as conn:
+        if reset:
+            conn.execute("DELETE FROM seen_ids WHERE source = ?", (source,))
+        conn.executemany("INSERT OR IGNORE INTO seen_ids (source, id) VALUES (?, ?)", [(source, r) for r in set(ids)])
+
+# --- Byte-offset watermarks for append-only files ---
+
+def _tail_hash(f, offset):
+    start = max(0, offset - TAIL_BYTES)
+    f.seek(start)
+    return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+def file_mark(path, end=None):
+    # {"offset", "tail"} of a file read up to end (default: all of it); what commit_range stores
+    with open(path, "rb") as f:
+        end = os.fstat(f.fileno()).st_size if end is None else end
+        return {"offset": end, "tail": _tail_hash(f, end)}
+
+def appended_since(path, mark, name=None):
+    # Returns (start, end): the byte range of complete lines added after mark; start is 0 when the
+    # file was rewritten (its bytes before the mark no longer match)
+    mark = mark or {"offset": 0, "tail": None}
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        start = mark["offset"]
+        if start > size or (start and _tail_hash(f, start) != mark["tail"]):
+            print(f"↩️ [{name or path}] {path} was rewritten since the last run, reading it from the start.")
+            start = 0
+    return start, max(start, complete_end(path))
+
+def appended_range(path, name, db_path=WATERMARK_DB):
+    # Returns (start, end): the byte range of complete lines added since the last commit
+    return appended_since(path, get_watermark(name, db_path), name)
+
+def complete_end(path):
+    # Offset just past the last complete line; full (non-incremental) runs commit this
+    with open(path, "rb") as f:
+        end = os.fstat(f.fileno()).st_size
+        while end > 0:
+            start = max(0, end - TAIL_BYTES)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+def commit_range(path, name, end, db_path=WATERMARK_DB):
+    set_watermark(name, file_mark(path, end), db_path)
+
+def iter_csv_records(path, start, end, chunk_rows):
+    # Yields (header bytes, raw records, offset just past them) over the byte range [start, end) of
+    # complete rows; chunk_rows=None yields everything as one chunk
+    with open(path, "rb") as f:
+        header = f.readline()
+        pos = max(start, len(header))
+        f.seek(pos)
+        rows = []
+        record = b""
+        quotes = 0
+        for line in f:
+            if pos >= end:
+                break
+            pos += len(line)
+            record += line
+            # A quoted field can span lines: a record is complete once its quotes balance
+            quotes += line.count(b'"')
+            if quotes % 2:
+                continue
+            rows.append(record)
+            record = b""
+            quotes = 0
+            if len(rows) == chunk_rows:
+                yield header, rows, pos
+                rows = []
+        if rows:
+            yield header, rows, pos
+
+def iter_csv_chunks(path, start, end, chunk_rows=None):
+    # Same byte range as frames: (frame, offset just past the chunk)
+    for header, rows, offset in iter_csv_records(path, start, end, chunk_rows):
+        yield pd.read_csv(io.BytesIO(header + b"".join(rows)), encoding="utf-8"), offset
+
+def read_appended_text(path, name, db_path=WATERMARK_DB):
+    start, end = appended_range(path, name, db_path)
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start).decode("utf-8"), end
+
+def read_appended_csv(path, name, db_path=WATERMARK_DB):
+    start, end = appended_range(path, name, db_path)
+    for df, _ in iter_csv_chunks(path, start, end):
+        return df, end
+    with open(path, "rb") as f:
+        return pd.read_csv(io.BytesIO(f.readline()), encoding="utf-8"), end
+
+def append_csv(df, path, columns=None):
+    # Appends rows, writing the header only for a new file and keeping the existing column order
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    exists = os.path.exists(path) and os.path.getsize(path) > 0
+    if exists and columns is None:
+        columns = pd.read_csv(path, nrows=0).columns.tolist()
+    if columns is not None:
+        df = df.reindex(columns=columns)
+    df.to_csv(path, mode="a", header=not exists, index=False)
+
+# --- Progress / checkpoint files ---
+
+def load_json_state(path, fingerprint):
+    # A saved progress/checkpoint file, or None when there is none or it belongs to a different input
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get("input") != fingerprint:
+        print(f"⚠️ {fingerprint['path']} changed since the interrupted run, starting over.")
+        return None
+    return state
+
+def write_json_atomic(path, data, **dump_kwargs):
+    # Written beside the target, fsynced, then swapped in: a crash leaves the old file or the new one
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
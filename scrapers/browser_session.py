@@ -0,0 +1,138 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, SessionNotCreatedException
+from webdriver_manager.chrome import ChromeDriverManager
+import atexit
+import contextlib
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+
+# --- Config ---
+DRIVER_CACHE_FILE = os.getenv("CHROMEDRIVER_CACHE", "data/cache/chromedriver.json")
+MAX_IDLE_BROWSERS = int(os.getenv("BROWSER_POOL_SIZE", "4"))
+PAGE_TIMEOUT = int(os.getenv("PAGE_TIMEOUT", "20"))
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+_idle = queue.LifoQueue()
+
+def resolve_driver_path(stale=None):
+    # stale: a path that failed to start Chrome; it is dropped from the cache and downloaded again
+    global _driver_path
+    if _driver_path and _driver_path != stale:
+        return _driver_path
+    with _driver_path_lock:
+        if _driver_path and _driver_path != stale:
+            return _driver_path
+        if stale and os.path.exists(DRIVER_CACHE_FILE):
+            os.remove(DRIVER_CACHE_FILE)
+
+        # 1) explicit override, 2) path cached by a previous run, 3) download via webdriver-manager
+        path = os.getenv("CHROMEDRIVER_PATH")
+        if path and path == stale:
+            raise RuntimeError(f"❌ CHROMEDRIVER_PATH={path} does not match the installed Chrome")
+        if not path and os.path.exists(DRIVER_CACHE_FILE):
+            with open(DRIVER_CACHE_FILE, "r", encoding="utf-8") as f:
+                cached = json.load(f).get("path")
+            if cached and os.path.exists(cached):
+                path = cached
+        if not path:
+            path = ChromeDriverManager().install()
+            os.makedirs(os.path.dirname(DRIVER_CACHE_FILE), exist_ok=True)
+            with open(DRIVER_CACHE_FILE, "w", encoding="utf-8") as f:
+                json.dump({"path": path}, f)
+
+        _driver_path = path
+        return path
+
+def _start_driver():
+    options = Options()
+    options.add_argument("--ignore-certificate-errors")
+    options.add_argument("--allow-insecure-localhost")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--headless=new")  # Use new headless mode (better support)
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    # ✅ Use a unique temp directory to avoid conflicts
+    user_data_dir = tempfile.mkdtemp()
+    options.add_argument(f"--user-data-dir={user_data_dir}")
+
+    driver_path = resolve_driver_path()
+    try:
+        driver = webdriver.Chrome(service=Service(driver_path), options=options)
+    except SessionNotCreatedException:
+        # Chrome was upgraded past the cached driver: fetch a matching one and retry once
+        print(f"⚠️ Chromedriver at {driver_path} no longer matches Chrome, re-resolving...")
+        driver = webdriver.Chrome(service=Service(resolve_driver_path(stale=driver_path)), options=options)
+
+    # Attach the path for later cleanup
+    driver.user_data_dir = user_data_dir
+    return driver
+
+def _close_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    if hasattr(driver, "user_data_dir"):
+        shutil.rmtree(driver.user_data_dir, ignore_errors=True)
+
+def is_alive(driver):
+    # A dead chromedriver may surface as a urllib3 connection error rather than a WebDriverException
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+@contextlib.contextmanager
+def browser_session():
+    # ♻️ Reuse a warm browser when one is idle, otherwise start a new one; idle browsers can die
+    # between runs (OOM, crash), so each is checked before it is handed out
+    driver = None
+    while driver is None:
+        try:
+            driver = _idle.get_nowait()
+        except queue.Empty:
+            driver = _start_driver()
+            break
+        if not is_alive(driver):
+            _close_driver(driver)
+            driver = None
+
+    try:
+        yield driver
+    finally:
+        if is_alive(driver) and _idle.qsize() < MAX_IDLE_BROWSERS:
+            _idle.put(driver)
+        else:
+            _close_driver(driver)
+
+def open_page(driver, url, ready_selector=None, timeout=PAGE_TIMEOUT):
+    driver.get(url)
+    wait = WebDriverWait(driver, timeout)
+    try:
+        wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+        if ready_selector:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ready_selector)))
+        return True
+    except TimeoutException:
+        print(f"⚠️ Timed out after {timeout}s waiting for {ready_selector or 'page load'} on {url}")
+        return False
+
+@atexit.register
+def shutdown_browsers():
+    while True:
+        try:
+            _close_driver(_idle.get_nowait())
+        except queue.Empty:
+            break
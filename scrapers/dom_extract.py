@@ -0,0 +1,85 @@
+# 🧭 Selector specs for every source live here, so a site redesign is a one-file fix.
+#
+# "rows" specs return one record per matching row; each field is looked up inside the
+# row (or inside row.cells[cell] when "cell" is set). "lists" specs return one list per
+# field, collected across the whole page. "ready" is the element a page must show
+# before it is worth extracting.
+SELECTOR_SPECS = {
+    "finviz_market_news": {
+        "mode": "rows",
+        "ready": "tr.news_table-row",
+        "rows": "tr.news_table-row",
+        "fields": {
+            "heading": {"selector": ".news_heading-cell"},
+            "time": {"selector": ".news_date-cell"},
+            "headline": {"selector": ".nn-tab-link"},
+        },
+    },
+    "finviz_stock_news": {
+        "mode": "rows",
+        "ready": "tr.news_table-row",
+        "rows": "tr.news_table-row",
+        "fields": {
+            "time": {"cell": 0},
+            "provider": {"cell": 1, "selector": "span.news_date-cell.color-text.is-muted.text-right", "pick": "last"},
+            "headline": {"cell": 1, "selector": ".nn-tab-link"},
+            "tickers": {"cell": 1, "selector": ".select-none", "pick": "all"},
+        },
+    },
+    "tradingview_news": {
+        "mode": "lists",
+        "ready": "relative-time",
+        "fields": {
+            "timestamps": {"selector": "relative-time", "attr": "title"},
+            "headlines": {"selector": "div[class*='title-BpSwpmE']"},
+            "providers": {"selector": "span[class*='provider']"},
+        },
+    },
+}
+
+# Runs inside the browser: one WebDriver round trip returns the whole page as plain JSON.
+EXTRACT_JS = """
+const spec = arguments[0];
+
+function readValue(el, attr) {
+    if (!el) return null;
+    if (!attr || attr === "text") return (el.innerText || el.textContent || "").trim();
+    const value = el.getAttribute(attr);
+    return value === null ? null : value.trim();
+}
+
+function readField(scope, field) {
+    if (field.cell !== undefined && field.cell !== null) {
+        scope = scope.cells ? scope.cells[field.cell] : null;
+    }
+    if (!scope) return field.pick === "all" ? [] : null;
+    const els = field.selector ? Array.from(scope.querySelectorAll(field.selector)) : [scope];
+    if (field.pick === "all") {
+        return els.map(el => readValue(el, field.attr)).filter(v => v);
+    }
+    const el = field.pick === "last" ? els[els.length - 1] : els[0];
+    return readValue(el, field.attr);
+}
+
+if (spec.mode === "lists") {
+    const out = {};
+    for (const [name, field] of Object.entries(spec.fields)) {
+        out[name] = Array.from(document.querySelectorAll(field.selector)).map(el => readValue(el, field.attr));
+    }
+    return out;
+}
+
+return Array.from(document.querySelectorAll(spec.rows)).map(row => {
+    const record = {};
+    for (const [name, field] of Object.entries(spec.fields)) {
+        record[name] = readField(row, field);
+    }
+    return record;
+});
+"""
+
+def ready_selector(source):
+    return SELECTOR_SPECS[source].get("ready")
+
+def extract(driver, source):
+    return driver.execute_script(EXTRACT_JS, SELECTOR_SPECS[source])
@@ -1,71 +1,36 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import tempfile
-import time
-import re
+from scrapers.browser_session import browser_session, open_page
+from scrapers.dom_extract import extract, ready_selector
+from pipeline import watermarks
+from pipeline.symbol_index import tag_tickers
 import os
 import csv
 from datetime import datetime
-import shutil
 
 # --- Config ---
 TARGET_URL = "https://finviz.com/news.ashx?v=3"
 OUTPUT_FILE = "data/raw/finviz_stock_news.txt"
 
-def cleanup_driver(driver):
-    if hasattr(driver, "user_data_dir"):
-        shutil.rmtree(driver.user_data_dir, ignore_errors=True)
-
-def setup_driver():
-    options = Options()
-    options.add_argument("--ignore-certificate-errors")
-    options.add_argument("--allow-insecure-localhost")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    return driver
-
-
 def scrape_stock_news(driver):
     print(f"Navigating to {TARGET_URL}...")
-    driver.get(TARGET_URL)
-    time.sleep(5)  # Wait for the full page to load
+    open_page(driver, TARGET_URL, ready_selector("finviz_stock_news"))
 
-    rows = driver.find_elements(By.CSS_SELECTOR, "tr.news_table-row")
+    # One scripted call returns every row; no per-cell WebDriver round trips
+    rows = extract(driver, "finviz_stock_news")
     print(f"✅ Found {len(rows)} rows.")
 
     data_lines = []
 
     for row in rows:
-        try:
-            tds = row.find_elements(By.TAG_NAME, "td")
-
-            time_text = tds[0].text.strip() if len(tds) > 0 else ""
-
-            provider_elem = tds[1].find_elements(
-                By.CSS_SELECTOR,
-                "span.news_date-cell.color-text.is-muted.text-right"
-            )
-            provider_text = provider_elem[-1].text.strip() if provider_elem else "Unknown"
-
-            headline_elem = tds[1].find_element(By.CLASS_NAME, "nn-tab-link")
-            headline = headline_elem.text.strip()
+        if row["headline"] is None:
+            print("⚠️ Error scraping a row: headline not found")
+            continue
 
-            tickers_elem = tds[1].find_elements(By.CLASS_NAME, "select-none")
-            tickers = [t.text.strip() for t in tickers_elem if t.text.strip()]
-            ticker_str = ", ".join(tickers)
+        time_text = row["time"] or ""
+        provider_text = row["provider"] or "Unknown"
+        ticker_str = ", ".join(row["tickers"])
 
-            line = f"{time_text}, {provider_text}, {headline}, {ticker_str}"
-            data_lines.append(line)
-
-        except Exception as e:
-            print(f"⚠️ Error scraping a row: {e}")
-            continue
+        line = f"{time_text}, {provider_text}, {row['headline']}, {ticker_str}"
+        data_lines.append(line)
 
     return data_lines
 
@@ -73,10 +38,10 @@ def save_to_txt(data_lines, output_file):
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
     with open(output_file, "w", encoding="utf-8") as f:
         for line in data_lines:
-            f.write(line + "")
+            f.write(line + "\n")
     print(f"✅ Scraped and saved {len(data_lines)} rows to '{output_file}'")
 
-def clean_finviz_news():
+def clean_finviz_news(incremental=watermarks.INCREMENTAL):
     input_txt = "data/raw/finviz_stock_news.txt"
     output_csv = "data/processed/finviz_stock_news.csv"
     today = datetime.today().strftime("%Y-%m-%d")
@@ -97,28 +62,41 @@ def clean_finviz_news():
         provider = parts[1]
         headline = parts[2] if len(parts) == 3 else parts[2]
 
-        tickers = list(set(re.findall(r"[A-Z]{1,5}", headline)))
+        # The shared symbol index also sees the site's ticker column, which follows the headline
+        tickers = ", ".join(tag_tickers(", ".join(parts[2:])))
 
         data.append([today, provider, headline.strip(), tickers])
 
+    # The raw page is rewritten every scrape, so headlines identify what is new
+    ids = [watermarks.record_id(row[2]) for row in data]
+
+    if incremental:
+        keep = watermarks.unseen_mask("finviz_stock_news", ids)
+        new_data = [row for row, k in zip(data, keep) if k]
+        write_header = not os.path.exists(output_csv) or os.path.getsize(output_csv) == 0
+        with open(output_csv, "a", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(["date", "provider", "headline", "tickers"])
+            writer.writerows(new_data)
+        watermarks.mark_seen("finviz_stock_news", ids)
+        print(f"✅ Appended {len(new_data)} new headlines to: {output_csv}")
+        return
+
     # Write to CSV
     with open(output_csv, "w", encoding="utf-8", newline="") as f:
         writer = csv.writer(f)
         writer.writerow(["date", "provider", "headline", "tickers"])
         writer.writerows(data)
+    watermarks.mark_seen("finviz_stock_news", ids, reset=True)
 
     print("✅ Cleaned CSV saved as:", output_csv)
 
-def finviz_stock_news_scraper():
-    driver = setup_driver()
-    try:
+def finviz_stock_news_scraper(incremental=watermarks.INCREMENTAL):
+    with browser_session() as driver:
         data_lines = scrape_stock_news(driver)
-    finally:
-        driver.quit()
-        cleanup_driver(driver)
     save_to_txt(data_lines, OUTPUT_FILE)
-    time.sleep(2)  # Ensure file is written before processing
-    clean_finviz_news()
+    clean_finviz_news(incremental=incremental)
 
 if __name__ == "__main__":
     finviz_stock_news_scraper()
@@ -1,93 +1,135 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
+from scrapers.browser_session import browser_session, open_page, resolve_driver_path, is_alive, PAGE_TIMEOUT
+from scrapers.dom_extract import extract, ready_selector
 import time
-import tempfile
 import re
 import os
-import shutil
-
-def scrape_all_tradingview(output_file: str = 'data/raw/tradingview_news.txt'):
-    # List of URLs to scrape
-    urls = [
-        "https://in.tradingview.com/news/top-stories/all/",
-        "https://in.tradingview.com/news/top-providers/reuters/",
-        "https://in.tradingview.com/news/top-providers/trading-economics/",
-        "https://in.tradingview.com/news/top-providers/moneycontrol/",
-        "https://in.tradingview.com/news/top-providers/tradingview/",
-        "https://in.tradingview.com/news/top-providers/marketbeat/",
-        "https://in.tradingview.com/news/top-providers/barchart/",
-        "https://in.tradingview.com/news/top-providers/cointelegraph/",
-        "https://in.tradingview.com/news/top-providers/beincrypto/",
-        "https://in.tradingview.com/news/top-providers/zacks/",
-        "https://in.tradingview.com/news/top-providers/stockstory/",
-        "https://in.tradingview.com/news/top-providers/marketindex/",
-        "https://in.tradingview.com/news/markets/crypto/",
-        "https://in.tradingview.com/news/markets/corporate-bonds/",
-        "https://in.tradingview.com/news/world/middle-east/",
-        "https://in.tradingview.com/news/world/south-america/",
-        "https://in.tradingview.com/news/world/uk/",
-        "https://in.tradingview.com/news/world/asia/",
-        "https://in.tradingview.com/news/world/oceania/"
+import queue
+import threading
+import contextvars
+
+# --- Config ---
+OUTPUT_FILE = "data/raw/tradingview_news.txt"
+WORKERS = int(os.getenv("TRADINGVIEW_WORKERS", "4"))
+TRADINGVIEW_URLS = [
+    "https://in.tradingview.com/news/top-stories/all/",
+    "https://in.tradingview.com/news/top-providers/reuters/",
+    "https://in.tradingview.com/news/top-providers/trading-economics/",
+    "https://in.tradingview.com/news/top-providers/moneycontrol/",
+    "https://in.tradingview.com/news/top-providers/tradingview/",
+    "https://in.tradingview.com/news/top-providers/marketbeat/",
+    "https://in.tradingview.com/news/top-providers/barchart/",
+    "https://in.tradingview.com/news/top-providers/cointelegraph/",
+    "https://in.tradingview.com/news/top-providers/beincrypto/",
+    "https://in.tradingview.com/news/top-providers/zacks/",
+    "https://in.tradingview.com/news/top-providers/stockstory/",
+    "https://in.tradingview.com/news/top-providers/marketindex/",
+    "https://in.tradingview.com/news/markets/crypto/",
+    "https://in.tradingview.com/news/markets/corporate-bonds/",
+    "https://in.tradingview.com/news/world/middle-east/",
+    "https://in.tradingview.com/news/world/south-america/",
+    "https://in.tradingview.com/news/world/uk/",
+    "https://in.tradingview.com/news/world/asia/",
+    "https://in.tradingview.com/news/world/oceania/"
+]
+
+def scrape_url(driver, url):
+    if not open_page(driver, url, ready_selector("tradingview_news")):
+        raise TimeoutError(f"news list not ready after {PAGE_TIMEOUT}s")
+
+    # Timestamps, headlines and providers in a single scripted call
+    page = extract(driver, "tradingview_news")
+    timestamps = page["timestamps"]
+    headlines = page["headlines"]
+    providers = page["providers"]
+
+    # Align lengths
+    min_len = min(len(timestamps), len(headlines), len(providers))
+    return [f"[{timestamps[i]}] ({providers[i]}) {headlines[i]}" for i in range(min_len)]
+
+def _browser_worker(url_queue, result_queue):
+    # Results are (url, lines, elapsed, error); a final (None, [], 0.0, error) means this worker's browser died
+    try:
+        with browser_session() as driver:
+            while True:
+                try:
+                    url = url_queue.get_nowait()
+                except queue.Empty:
+                    break
+                print(f"[→] Scraping: {url}")
+                start = time.perf_counter()
+                try:
+                    lines = scrape_url(driver, url)
+                    result_queue.put((url, lines, time.perf_counter() - start, None))
+                except Exception as e:
+                    result_queue.put((url, [], time.perf_counter() - start, e))
+                    if not is_alive(driver):
+                        raise
+    except Exception as e:
+        # Leave the remaining URLs to the surviving workers
+        print(f"[✗] Browser worker stopped: {e}")
+        result_queue.put((None, [], 0.0, e))
+
+def scrape_all_tradingview(output_file: str = OUTPUT_FILE, urls=None, workers: int = WORKERS):
+    urls = list(urls or TRADINGVIEW_URLS)
+    url_queue = queue.Queue()
+    for url in urls:
+        url_queue.put(url)
+    result_queue = queue.Queue()
+
+    # 🧵 Spread the URL list over a pool of warm headless browsers (driver resolved once, not per worker)
+    resolve_driver_path()
+    workers = max(1, min(workers, len(urls)))
+    threads = [
+        threading.Thread(target=contextvars.copy_context().run, args=(_browser_worker, url_queue, result_queue), daemon=True)
+        for _ in range(workers)
     ]
-
-    options = Options()
-    options.add_argument("--ignore-certificate-errors")
-    options.add_argument("--allow-insecure-localhost")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--headless=new")  # ✅ Recommended headless mode
-
-    # ✅ Create a unique temp user data dir
-    user_data_dir = tempfile.mkdtemp()
-    options.add_argument(f"--user-data-dir={user_data_dir}")
-
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-
-    # 🧹 Save the path to cleanup later
-    driver.user_data_dir = user_data_dir
+    for thread in threads:
+        thread.start()
 
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    timings = []
+    failures = []
 
+    # ✍️ Single writer: only this thread touches the output file
+    alive = workers
     with open(output_file, 'a', encoding='utf-8') as f:
-        for url in urls:
-            print(f"[→] Scraping: {url}")
-            driver.get(url)
-            time.sleep(5)
-
-            # Extract timestamps
-            timestamp_elements = driver.find_elements(By.XPATH, '//relative-time')
-            timestamps = [elem.get_attribute('title') for elem in timestamp_elements]
-
-            # Extract headlines
-            headline_elements = driver.find_elements(By.XPATH, '//div[contains(@class, "title-BpSwpmE")]')
-            headlines = [elem.text.strip() for elem in headline_elements]
-
-            # Extract providers
-            provider_elements = driver.find_elements(By.XPATH, '//span[contains(@class, "provider")]')
-            providers = [elem.text.strip() for elem in provider_elements]
-
-            # Align lengths
-            min_len = min(len(timestamps), len(headlines), len(providers))
-
-            for i in range(min_len):
-                f.write(f"[{timestamps[i]}] ({providers[i]}) {headlines[i]}")
-
-            print(f"[✓] Done: {min_len} items scraped")
-
-    driver.quit()
-    cleanup_driver(driver)
+        while len(timings) < len(urls):
+            url, lines, elapsed, error = result_queue.get()
+            if url is None:
+                alive -= 1
+                if alive == 0:
+                    # No browser left: whatever is still queued can't be scraped this run
+                    while True:
+                        try:
+                            url = url_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        timings.append((url, 0.0, 0))
+                        failures.append((url, error))
+                        print(f"[✗] Failed: {url} (no browser left: {error})")
+                    break
+                continue
+            timings.append((url, elapsed, len(lines)))
+            if error is not None:
+                failures.append((url, error))
+                print(f"[✗] Failed: {url} after {elapsed:.1f}s ({error})")
+                continue
+            for line in lines:
+                f.write(line + "\n")
+            print(f"[✓] Done: {len(lines)} items scraped from {url} in {elapsed:.1f}s")
+
+    for thread in threads:
+        thread.join()
+
+    print(f"[⏱] Per-URL timings ({workers} workers):")
+    for url, elapsed, count in sorted(timings, key=lambda t: -t[1]):
+        print(f"    {elapsed:6.1f}s  {count:4d} items  {url}")
+    if failures:
+        print(f"[⚠] {len(failures)} of {len(urls)} URLs failed")
     print("[✔] All done! Saved to", output_file)
+    return {"timings": timings, "failures": failures}
 
 
-def cleanup_driver(driver):
-    if hasattr(driver, "user_data_dir"):
-        shutil.rmtree(driver.user_data_dir, ignore_errors=True)
-
 def parse_news_line(line):
     # Extract timestamp
     timestamp_match = re.search(r"[(.*?)]", line)
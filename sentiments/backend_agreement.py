@@ -0,0 +1,66 @@
+import sys
+import time
+import pandas as pd
+from sentiments.finbert_engine import score_headlines, BATCH_SIZE
+from sentiments.model_registry import get_finbert, get_ner_pipeline, BACKENDS
+from sentiments.finviz_tradingview_sentiment import ner_tickers
+
+# 🔧 Configuration
+FIXTURES = [
+    "data/processed/finviz_stock_news.csv",
+    "data/processed/finviz_tradingview_merged.csv",
+    "data/processed/google_reddit_news.csv",
+]
+MIN_AGREEMENT = 0.98  # share of headlines whose label must match the fp32 reference
+NER_SAMPLE = 200
+
+def load_headlines(paths=FIXTURES, limit=None):
+    headlines = []
+    for path in paths:
+        df = pd.read_csv(path)
+        column = "headline" if "headline" in df else "Headline"
+        headlines += df[column].dropna().astype(str).tolist()
+    headlines = list(dict.fromkeys(headlines))
+    return headlines[:limit] if limit else headlines
+
+def timed_scores(headlines, backend, batch_size=BATCH_SIZE):
+    tokenizer, model = get_finbert(backend)
+    start = time.perf_counter()
+    labels, _ = score_headlines(headlines, tokenizer, model, batch_size=batch_size)
+    return labels, time.perf_counter() - start
+
+def timed_tickers(headlines, backend):
+    ner = get_ner_pipeline(backend)
+    start = time.perf_counter()
+    tickers = [ner_tickers(found) for found in ner(headlines, batch_size=BATCH_SIZE)]
+    return tickers, time.perf_counter() - start
+
+def check_backend(backend, limit=None, min_agreement=MIN_AGREEMENT):
+    headlines = load_headlines(limit=limit)
+    print(f"🧪 Comparing '{backend}' against fp32 on {len(headlines)} fixture headlines")
+
+    reference, ref_time = timed_scores(headlines, "torch")
+    candidate, cand_time = timed_scores(headlines, backend)
+    agreement = sum(a == b for a, b in zip(reference, candidate)) / max(len(headlines), 1)
+    print(f"📊 FinBERT label agreement: {agreement:.2%} | "
+          f"fp32 {len(headlines) / ref_time:.1f}/s vs {backend} {len(headlines) / cand_time:.1f}/s "
+          f"({ref_time / cand_time:.2f}x)")
+    print(pd.crosstab(pd.Series(reference, name="fp32"), pd.Series(candidate, name=backend)))
+
+    sample = headlines[:NER_SAMPLE]
+    ref_tickers, ref_ner_time = timed_tickers(sample, "torch")
+    cand_tickers, cand_ner_time = timed_tickers(sample, backend)
+    ner_agreement = sum(a == b for a, b in zip(ref_tickers, cand_tickers)) / max(len(sample), 1)
+    print(f"📊 NER ticker agreement: {ner_agreement:.2%} on {len(sample)} headlines ({ref_ner_time / cand_ner_time:.2f}x)")
+
+    passed = agreement >= min_agreement
+    print(f"{'✅' if passed else '❌'} Agreement threshold {min_agreement:.0%} {'met' if passed else 'NOT met'}")
+    return passed
+
+if __name__ == "__main__":
+    backend = sys.argv[1] if len(sys.argv) > 1 else "int8"
+    if backend not in BACKENDS or backend == "torch":
+        print(f"Usage: python -m sentiments.backend_agreement [{'|'.join(b for b in BACKENDS if b != 'torch')}] [limit]")
+        sys.exit(2)
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    sys.exit(0 if check_backend(backend, limit) else 1)
@@ -1,21 +1,22 @@
 import os
 import json
-import pandas as pd
-import time
-import requests
 import random
 from tqdm import tqdm
 from dotenv import load_dotenv
+from sentiments.llm_client import label_prompts
+from pipeline import watermarks
 
 load_dotenv()
 
 # ========== 🔑 CONFIG ==========
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 MODEL = "meta-llama/llama-3-8b-instruct"
-API_URL = "https://openrouter.ai/api/v1/chat/completions"
-BATCH_SIZE = 20
+API_URL = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+CHUNK_ROWS = 200    # rows read from the CSV (and labeled) at a time
+FLUSH_EVERY = 20    # records between flush + fsync + checkpoint
 INPUT_CSV = "data/merged/finviz_tradingview_merged.csv"
 OUTPUT_JSONL = "data/converted_jsonl/converted.jsonl"
+CHECKPOINT_FILE = OUTPUT_JSONL + ".ckpt"
 UNIVERSAL_INSTRUCTIONS = [
     "Analyze the sentiment of this stock market news headline.",
     "Determine if the following stock market news headline is bullish, bearish, or neutral.",
@@ -54,59 +55,108 @@ def format_jsonl(instruction, input_text, output_text):
         "output": output_text
     }
 
-def call_llm(prompt):
-    payload = {
+def build_payload(prompt):
+    return {
         "model": MODEL,
         "messages": [{"role": "user", "content": prompt}],
         "temperature": 0.7
     }
 
-    try:
-        response = requests.post(API_URL, headers=HEADERS, json=payload, timeout=30)
-        if response.status_code == 200:
-            return response.json()['choices'][0]['message']['content']
-        else:
-            print(f"❌ Error {response.status_code}: {response.text}")
-    except Exception as e:
-        print(f"⚠️ Exception: {e}")
-    return None
-
-def process_batch(batch_df):
-    results = []
-    for _, row in batch_df.iterrows():
-        headline = row['headline']
-        instruction = random.choice(UNIVERSAL_INSTRUCTIONS)
-        prompt = build_prompt(instruction, headline)
-        output = call_llm(prompt)
+def process_batch(batch_df, on_result=None):
+    headlines = batch_df['headline'].tolist()
+    instructions = [random.choice(UNIVERSAL_INSTRUCTIONS) for _ in headlines]
+    prompts = [build_prompt(instruction, headline) for instruction, headline in zip(instructions, headlines)]
 
+    def format_output(index, output):
         if output:
-            formatted = format_jsonl(instruction, headline, output.strip())
-        else:
-            formatted = format_jsonl(instruction, headline, "Sentiment: Unknown\nReason: API call failed.")
-
-        results.append(formatted)
-        time.sleep(1)
-
-    return results
-
-def save_jsonl(data_list, filename):
-    with open(filename, 'w', encoding='utf-8') as f:
-        for item in data_list:
-            f.write(json.dumps(item, ensure_ascii=False) + '\n')
-    print(f"✅ JSONL file saved: {filename}")
-
-def csv_to_json():
-    df = pd.read_csv(INPUT_CSV)
-    print(f"📊 Loaded {len(df)} headlines.")
-    all_results = []
-
-    for i in range(0, len(df), BATCH_SIZE):
-        batch_df = df.iloc[i:i+BATCH_SIZE]
-        print(f"🔄 Processing batch {i//BATCH_SIZE + 1}/{(len(df) + BATCH_SIZE - 1)//BATCH_SIZE}")
-        results = process_batch(batch_df)
-        all_results.extend(results)
-
-    save_jsonl(all_results, OUTPUT_JSONL)
+            return format_jsonl(instructions[index], headlines[index], output.strip())
+        return format_jsonl(instructions[index], headlines[index], "Sentiment: Unknown\nReason: API call failed.")
+
+    def handle(index, output):
+        if on_result is not None:
+            on_result(index, format_output(index, output))
+
+    # 🚀 Concurrent, rate-limited requests over one pooled connection
+    outputs, _ = label_prompts(prompts, API_URL, HEADERS, build_payload, on_result=handle)
+    return [format_output(i, output) for i, output in enumerate(outputs)]
+
+def input_fingerprint(path):
+    stat = os.stat(path)
+    return {"path": path, "size": stat.st_size, "mtime": stat.st_mtime}
+
+def csv_to_json(input_csv=INPUT_CSV, output_jsonl=OUTPUT_JSONL, checkpoint_path=CHECKPOINT_FILE,
+                incremental=watermarks.INCREMENTAL):
+    os.makedirs(os.path.dirname(output_jsonl) or ".", exist_ok=True)
+    if incremental:
+        # ⏩ Only rows appended since the last completed run; the CSV is append-only so row ids stay stable
+        start_offset, end_offset = watermarks.appended_range(input_csv, "llm:merged")
+        fingerprint = {"path": input_csv, "start_offset": start_offset}
+    else:
+        start_offset, end_offset = 0, watermarks.complete_end(input_csv)
+        fingerprint = input_fingerprint(input_csv)
+    checkpoint = watermarks.load_json_state(checkpoint_path, fingerprint)
+
+    if checkpoint:
+        # ♻️ Resume: drop anything written after the last checkpoint, it will be redone
+        with open(output_jsonl, 'a', encoding='utf-8') as f:
+            f.truncate(checkpoint["output_bytes"])
+        done = set(checkpoint["done"])
+        print(f"♻️ Resuming after {checkpoint['rows_done'] + len(done)} already-labeled rows.")
+    else:
+        if not incremental or not os.path.exists(output_jsonl):
+            open(output_jsonl, 'w', encoding='utf-8').close()
+        checkpoint = {"input": fingerprint, "rows_done": 0, "done": [], "output_bytes": os.path.getsize(output_jsonl)}
+        done = set()
+
+    progress = tqdm(desc="🔄 Labeling headlines", initial=checkpoint["rows_done"] + len(done))
+    total = 0
+
+    with open(output_jsonl, 'a', encoding='utf-8') as out:
+        def commit():
+            out.flush()
+            os.fsync(out.fileno())
+            checkpoint["done"] = sorted(done)
+            checkpoint["output_bytes"] = out.tell()
+            watermarks.write_json_atomic(checkpoint_path, checkpoint)
+
+        # 📦 Fixed-size chunks keep memory flat regardless of CSV size
+        # Only complete rows up to end_offset: a row still being appended is left for the next run
+        chunk_end = 0
+        for chunk, _ in watermarks.iter_csv_chunks(input_csv, start_offset, end_offset, CHUNK_ROWS):
+            chunk_start, chunk_end = chunk_end, chunk_end + len(chunk)
+            total = chunk_end
+            if chunk_end <= checkpoint["rows_done"]:
+                continue
+
+            row_ids = list(range(chunk_start, chunk_end))
+            pending = [i for i, row_id in enumerate(row_ids) if row_id >= checkpoint["rows_done"] and row_id not in done]
+            pending_df = chunk.iloc[pending]
+            since_commit = 0
+
+            def write_record(index, record):
+                nonlocal since_commit
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                done.add(row_ids[pending[index]])
+                progress.update(1)
+                since_commit += 1
+                if since_commit >= FLUSH_EVERY:
+                    commit()
+                    since_commit = 0
+
+            if len(pending_df):
+                process_batch(pending_df, on_result=write_record)
+
+            # Whole chunk finished: collapse its row ids into the watermark
+            checkpoint["rows_done"] = chunk_end
+            done.clear()
+            commit()
+
+    progress.close()
+    watermarks.commit_range(input_csv, "llm:merged", end_offset)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    print(f"📊 Labeled {total} headlines.")
+    print(f"✅ JSONL file saved: {output_jsonl}")
     print("🎯 All done!")
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+import os
+import json
+import sqlite3
+import hashlib
+import numpy as np
+from sentiments.near_dedupe import NEAR_DUP_THRESHOLD, NUM_PERM, _permutations, minhash_signature, choose_bands
+from pipeline import watermarks
+
+# 🔧 Configuration
+DEDUPE_DB = os.getenv("DEDUPE_INDEX_PATH", "data/cache/dedupe_index.sqlite")
+
+def input_key(text):
+    # Fixed-width key of the normalized input: 16 bytes per row instead of the row itself
+    return hashlib.blake2b(' '.join(text.split()).encode("utf-8"), digest_size=16).digest()
+
+def _file_state(path):
+    # Size + tail hash of the output: notices it was replaced or edited outside the cleaner
+    if not os.path.exists(path):
+        return {"offset": 0, "tail": None}
+    return watermarks.file_mark(path)
+
+class DedupeIndex:
+    # Persistent exact + near-duplicate index over the rows already in the cleaned output
+    def __init__(self, output_path, threshold=NEAR_DUP_THRESHOLD, num_perm=NUM_PERM, path=DEDUPE_DB):
+        self.output_path = output_path
+        self.threshold = threshold
+        self.near = threshold < 1
+        self.permutations = _permutations(num_perm)
+        self.bands, self.rows = choose_bands(threshold, num_perm) if self.near else (0, 0)
+        self.settings = {"output": os.path.abspath(output_path), "threshold": threshold, "num_perm": num_perm}
+        self.clusters = {}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS exact_inputs (key BLOB PRIMARY KEY) WITHOUT ROWID")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS lsh_docs (id INTEGER PRIMARY KEY, text TEXT NOT NULL, signature BLOB NOT NULL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS lsh_bands (band INTEGER NOT NULL, bucket BLOB NOT NULL, doc_id INTEGER NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS lsh_bands_lookup ON lsh_bands (band, bucket)")
+        self.conn.commit()
+
+        if self._meta("settings") != self.settings or self._meta("output_state") != _file_state(output_path):
+            self.rebuild()
+
+    def _meta(self, name):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_meta(self, name, value):
+        self.conn.execute(
+            "INSERT INTO meta (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+            (name, json.dumps(value))
+        )
+
+    def rebuild(self):
+        # Only when the output was replaced, edited by hand, or the LSH settings changed
+        print(f"🔁 Rebuilding dedupe index from {self.output_path}")
+        for table in ("exact_inputs", "lsh_docs", "lsh_bands"):
+            self.conn.execute(f"DELETE FROM {table}")
+        if os.path.exists(self.output_path):
+            with open(self.output_path, 'r', encoding='utf-8') as existing:
+                for line in existing:
+                    try:
+                        text = json.loads(line.strip()).get("input", "").strip()
+                    except json.JSONDecodeError:
+                        continue
+                    self.add_exact(text)
+                    if self.near:
+                        signature = self.signature(text)
+                        if self.find(signature) is None:
+                            self.add_near(text, signature)
+        self.commit()
+
+    # --- Exact matches ---
+
+    def contains(self, text):
+        return self.conn.execute("SELECT 1 FROM exact_inputs WHERE key = ?", (input_key(text),)).fetchone() is not None
+
+    def add_exact(self, text):
+        self.conn.execute("INSERT OR IGNORE INTO exact_inputs (key) VALUES (?)", (input_key(text),))
+
+    # --- Near duplicates: MinHash signatures bucketed by LSH band ---
+
+    def signature(self, text):
+        return minhash_signature(text, self.permutations)
+
+    def _band_keys(self, signature):
+        for i in range(self.bands):
+            band = signature[i * self.rows:(i + 1) * self.rows].tobytes()
+            yield i, hashlib.blake2b(band, digest_size=8).digest()
+
+    def find(self, signature):
+        checked = set()
+        for i, bucket in self._band_keys(signature):
+            rows = self.conn.execute(
+                "SELECT d.id, d.signature FROM lsh_bands b JOIN lsh_docs d ON d.id = b.doc_id WHERE b.band = ? AND b.bucket = ?",
+                (i, bucket)
+            )
+            for doc_id, stored in rows:
+                if doc_id in checked:
+                    continue
+                checked.add(doc_id)
+                if np.mean(np.frombuffer(stored, dtype=np.uint32) == signature) >= self.threshold:
+                    return doc_id
+        return None
+
+    def add_near(self, text, signature):
+        doc_id = self.conn.execute(
+            "INSERT INTO lsh_docs (text, signature) VALUES (?, ?)", (text, signature.tobytes())
+        ).lastrowid
+        self.conn.executemany(
+            "INSERT INTO lsh_bands (band, bucket, doc_id) VALUES (?, ?, ?)",
+            [(i, bucket, doc_id) for i, bucket in self._band_keys(signature)]
+        )
+
+    def is_near_duplicate(self, text):
+        # Indexes texts it has not seen; matches are recorded for this run's cluster report
+        if not self.near:
+            return False
+        signature = self.signature(text)
+        match = self.find(signature)
+        if match is None:
+            self.add_near(text, signature)
+            return False
+        self.clusters.setdefault(match, []).append(text)
+        return True
+
+    def cluster_report(self):
+        clusters = []
+        for doc_id, dropped in self.clusters.items():
+            kept = self.conn.execute("SELECT text FROM lsh_docs WHERE id = ?", (doc_id,)).fetchone()[0]
+            clusters.append({"kept": kept, "dropped": dropped})
+        return sorted(clusters, key=lambda c: len(c["dropped"]), reverse=True)
+
+    def commit(self):
+        # Called after the output file is flushed so the recorded state matches it
+        self._set_meta("settings", self.settings)
+        self._set_meta("output_state", _file_state(self.output_path))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
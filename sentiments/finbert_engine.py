@@ -0,0 +1,58 @@
+import os
+import torch
+from torch.nn.functional import softmax
+
+# 🔧 Configuration
+BATCH_SIZE = int(os.getenv("FINBERT_BATCH_SIZE", "32"))
+MAX_LENGTH = 512
+
+# Sentiment mapping (FinBERT returns: 0 = negative, 1 = positive, 2 = neutral)
+LABEL_MAP = {
+    0: "Bearish",
+    1: "Bullish",
+    2: "Neutral"
+}
+
+def score_headlines(texts, tokenizer, model, batch_size=BATCH_SIZE):
+    texts = [text if isinstance(text, str) else "" for text in texts]
+    labels = [None] * len(texts)
+    probs = [None] * len(texts)
+    if not texts:
+        return labels, probs
+
+    # Tokenize everything once (no padding) so we know each headline's length
+    encoded = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+    keys = list(encoded.keys())
+
+    # 📏 Sort by token length so each batch pads to roughly the same size
+    order = sorted(range(len(texts)), key=lambda i: len(encoded["input_ids"][i]))
+
+    if hasattr(model, "eval"):  # ONNX Runtime models have no train/eval mode
+        model.eval()
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            batch_idx = order[start:start + batch_size]
+            features = {key: [encoded[key][i] for i in batch_idx] for key in keys}
+            inputs = tokenizer.pad(features, padding=True, return_tensors="pt")
+
+            scores = softmax(model(**inputs).logits, dim=1)
+            predicted = torch.argmax(scores, dim=1).tolist()
+
+            for row, i in enumerate(batch_idx):
+                labels[i] = LABEL_MAP[predicted[row]]
+                probs[i] = [round(p, 6) for p in scores[row].tolist()]
+
+    return labels, probs
+
+def predict_sentiments_cached(texts, tokenizer, model, cache, batch_size=BATCH_SIZE, score_fn=score_headlines):
+    texts = [text if isinstance(text, str) else "" for text in texts]
+    entries = cache.get_many(texts)
+
+    # Only headlines the cache has never seen go through the model (once each)
+    missing = list(dict.fromkeys(t for t, entry in zip(texts, entries) if entry is None))
+    labels, probs = score_fn(missing, tokenizer, model, batch_size=batch_size)
+    cache.put_many(zip(missing, labels, probs))
+
+    scored = dict(zip(missing, labels))
+    sentiments = [entry["sentiment"] if entry else scored[t] for t, entry in zip(texts, entries)]
+    return sentiments, entries
@@ -1,49 +1,48 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-import pandas as pd
-from torch.nn.functional import softmax
-import os
-
-def finviz_stock_sentiment():
-    # Load FinBERT model
-    tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
-    model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert")
+import sys
+from sentiments.finbert_engine import predict_sentiments_cached, score_headlines, BATCH_SIZE
+from sentiments.sentiment_backfill import ShardedScorer
+from sentiments.model_registry import get_finbert
+from sentiments.sentiment_stage import run_sentiment_stage
+from pipeline import watermarks
+from pipeline.chunked_csv import STREAMING, CHUNK_ROWS
+
+def finviz_stock_sentiment(batch_size=BATCH_SIZE, incremental=watermarks.INCREMENTAL, workers=1,
+                           streaming=STREAMING, chunk_rows=CHUNK_ROWS):
+    # workers > 1 is backfill mode: cache misses are sharded across a process pool, each worker loading FinBERT once
+    # for the whole stage (streamed chunks included)
+    if workers > 1:
+        tokenizer = model = None
+        score_fn = ShardedScorer(workers=workers)
+    else:
+        # FinBERT is loaded once per process and shared with the TradingView stage
+        tokenizer, model = get_finbert()
+        score_fn = score_headlines
 
     # Input and output file paths
     INPUT_FILE = r"data/processed/finviz_stock_news.csv"
     OUTPUT_FILE = r"data/sentiment_encoded/finviz_sentiment_stock_news.csv"
 
-    # Load encoded headlines
-    df = pd.read_csv(INPUT_FILE)
-
-    # Validate required columns
-    if 'headline' not in df.columns or 'tickers' not in df.columns:
-        raise ValueError("❌ Required columns ('headline', 'tickers') not found in the CSV.")
-
-    # Sentiment label mapping
-    label_map = {
-        0: "Bearish",   # negative
-        1: "Bullish",   # positive
-        2: "Neutral"    # neutral
-    }
-
-    # Predict sentiment
-    sentiments = []
-    for text in df["headline"].fillna(""):
-        inputs = tokenizer(text, return_tensors="pt", truncation=True)
-        with torch.no_grad():
-            logits = model(**inputs).logits
-            probs = softmax(logits, dim=1)
-            label = torch.argmax(probs).item()
-            sentiment = label_map[label]
-            sentiments.append(sentiment)
-
-    # Add sentiment column and save
-    df["sentiment"] = sentiments
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    df.to_csv(OUTPUT_FILE, index=False)
+    def require_columns(df):
+        if 'headline' not in df.columns or 'tickers' not in df.columns:
+            raise ValueError("❌ Required columns ('headline', 'tickers') not found in the CSV.")
+
+    def score(df, cache):
+        # Predict sentiment in length-sorted batches, skipping headlines already cached
+        require_columns(df)
+        sentiments, _ = predict_sentiments_cached(df["headline"].fillna("").tolist(), tokenizer, model, cache,
+                                                  batch_size=batch_size, score_fn=score_fn)
+        df["sentiment"] = sentiments
+        return df
+
+    try:
+        run_sentiment_stage(INPUT_FILE, OUTPUT_FILE, "sentiment:stock_news", score, "stock news",
+                            incremental=incremental, streaming=streaming, chunk_rows=chunk_rows)
+    finally:
+        if workers > 1:
+            score_fn.close()
 
     print(f"✅ Sentiment-encoded file saved to: {OUTPUT_FILE}")
 
 if __name__ == "__main__":
-    finviz_stock_sentiment()
\ No newline at end of file
+    # python -m sentiments.finviz_stocknews_sentiment [workers]
+    finviz_stock_sentiment(workers=int(sys.argv[1]) if len(sys.argv) > 1 else 1)
\ No newline at end of file
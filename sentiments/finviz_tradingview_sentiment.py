@@ -1,55 +1,91 @@
-import pandas as pd
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, AutoModelForTokenClassification, pipeline
+import os
+import re
+from sentiments.finbert_engine import predict_sentiments_cached, BATCH_SIZE
+from sentiments.model_registry import get_finbert, get_ner_pipeline, ner_revision
+from sentiments.sentiment_stage import run_sentiment_stage
+from pipeline import watermarks
+from pipeline.symbol_index import get_symbol_index
+from pipeline.chunked_csv import STREAMING, CHUNK_ROWS
 
-def finviz_tradingview_sentiment():
-    # Load FinBERT model for sentiment
-    sentiment_tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
-    sentiment_model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert")
+# 🔧 Configuration
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "32"))
+# TradingView lines usually open with the symbol they are about: "XAU/USD: ...", "OPEN: ...", "IXIC: ..."
+SYMBOL_PREFIX = re.compile(r"^\s*([A-Z][A-Z0-9.&/!_-]{0,11}):\s")
+TAGGER_VERSION = 4  # bump whenever extract_tickers changes how tickers are found; cached tickers are keyed on it
 
-    # Load NER model for ticker extraction
-    ner_tokenizer = AutoTokenizer.from_pretrained("dslim/bert-base-NER")
-    ner_model = AutoModelForTokenClassification.from_pretrained("dslim/bert-base-NER")
-    ner_pipeline = pipeline("ner", model=ner_model, tokenizer=ner_tokenizer, grouped_entities=True)
+def prefix_symbol(text, index=None):
+    # Only prefixes the symbol index knows count ("XAUUSD:" -> XAU/USD); labels of the same shape
+    # ("UPDATE:", "CEO:", "Q2:") and symbols outside the universe fall through to the index and NER
+    match = SYMBOL_PREFIX.match(text)
+    if not match:
+        return None
+    return (index or get_symbol_index()).tag(match.group(1)) or None
 
-    # Load input CSV
+def ner_tickers(entities):
+    # Keep ORG-like entities that look like tickers
+    tickers = []
+    for ent in entities:
+        word = ent['word'].replace('##', '').strip()
+        if word.isupper() and 1 <= len(word) <= 5:
+            tickers.append(word)
+    return sorted(set(tickers))
+
+def ticker_revision():
+    # Cached tickers are only valid for the same rules, symbol universe and NER model
+    return f"tagger{TAGGER_VERSION}+universe:{get_symbol_index().fingerprint}+{ner_revision()}"
+
+def extract_tickers(texts, ner_pipeline=None, batch_size=NER_BATCH_SIZE):
+    # SYMBOL: prefix and the shared symbol index first; only headlines neither resolves go through NER, batched
+    index = get_symbol_index()
+    tickers = []
+    stats = {"prefix": 0, "index": 0, "ner": 0}
+    for text in texts:
+        prefix = prefix_symbol(text, index)
+        found = sorted(set((prefix or []) + index.tag(text)))
+        if found:
+            stats["prefix" if prefix else "index"] += 1
+        tickers.append(found or None)
+
+    pending = [i for i, found in enumerate(tickers) if found is None]
+    if pending:
+        ner_pipeline = ner_pipeline or get_ner_pipeline()
+        entities = ner_pipeline([texts[i] for i in pending], batch_size=batch_size)
+        for i, found in zip(pending, entities):
+            tickers[i] = ner_tickers(found)
+    stats["ner"] = len(pending)
+    return tickers, stats
+
+def finviz_tradingview_sentiment(batch_size=BATCH_SIZE, incremental=watermarks.INCREMENTAL,
+                                 streaming=STREAMING, chunk_rows=CHUNK_ROWS):
+    # FinBERT for sentiment (process-resident); NER is only loaded if a headline needs it
+    sentiment_tokenizer, sentiment_model = get_finbert()
     input_path = r"data/processed/finviz_tradingview_merged.csv"
-    df = pd.read_csv(input_path)
-
-    # Sentiment mapping (FinBERT returns: 0 = negative, 1 = positive, 2 = neutral)
-    label_map = {
-        0: "Bearish",
-        1: "Bullish",
-        2: "Neutral"
-    }
-
-    # Run sentiment analysis
-    def get_sentiment(text):
-        inputs = sentiment_tokenizer(text, return_tensors="pt", truncation=True)
-        with torch.no_grad():
-            outputs = sentiment_model(**inputs)
-            scores = torch.nn.functional.softmax(outputs.logits, dim=1)
-            predicted_class = torch.argmax(scores, dim=1).item()
-        return label_map[predicted_class]
-
-    # Run NER to extract tickers (ORG-like entities)
-    def extract_tickers(text):
-        entities = ner_pipeline(text)
-        tickers = []
-        for ent in entities:
-            word = ent['word'].replace('##', '').strip()
-            if word.isupper() and 1 <= len(word) <= 5:
-                tickers.append(word)
-        return ', '.join(sorted(set(tickers)))
-
-    # Apply both sentiment and ticker extraction
-    df["sentiment"] = df["headline"].fillna("").apply(get_sentiment)
-    df["tickers"] = df["headline"].fillna("").apply(extract_tickers)
-
-    # Save output
     output_path = r"data/sentiment_encoded/finviz_sentiment_tradingview.csv"
-    df.to_csv(output_path, index=False)
 
+    def score(df, cache):
+        # Apply both sentiment and ticker extraction, reusing cached results where possible
+        headlines = df["headline"].fillna("").tolist()
+        sentiments, _ = predict_sentiments_cached(headlines, sentiment_tokenizer, sentiment_model, cache, batch_size=batch_size)
+
+        # Tickers are only extracted for headlines never tagged by the current rules and symbol universe
+        unique = list(dict.fromkeys(headlines))
+        revision = ticker_revision()
+        tickers_by_headline = {h: t for h, t in zip(unique, cache.get_tickers(unique, revision)) if t is not None}
+        cached = len(tickers_by_headline)
+        missing = [h for h in unique if h not in tickers_by_headline]
+        extracted, stats = extract_tickers(missing)
+        cache.put_tickers(zip(missing, extracted), revision)
+        tickers_by_headline.update(zip(missing, extracted))
+        print(f"🔎 [tradingview] Tickers for {cached + len(missing)} unique headlines: "
+              f"{cached} cached, {stats['prefix']} from SYMBOL: prefix, {stats['index']} from the symbol index, "
+              f"{stats['ner']} via batched NER")
+
+        df["sentiment"] = sentiments
+        df["tickers"] = [', '.join(tickers_by_headline[h]) for h in headlines]
+        return df
+
+    run_sentiment_stage(input_path, output_path, "sentiment:tradingview", score, "tradingview",
+                        incremental=incremental, streaming=streaming, chunk_rows=chunk_rows)
     print(f"✅ Sentiment analysis completed and saved to {output_path}")
 
 if __name__ == "__main__":
@@ -1,32 +1,39 @@
+import io
 import json
 import os
-import random
+from pipeline import watermarks
+from sentiments.near_dedupe import NEAR_DUP_THRESHOLD
+from sentiments.dedupe_index import DedupeIndex
+from sentiments.jsonl_shuffler import shuffle_jsonl
 
 # 🔧 Configuration
 INPUT_FILE = "data/converted_jsonl/converted.jsonl"
 OUTPUT_FILE = "data/cleaned_jsonl/final_cleaned.jsonl"
 SHUFFLED_OUTPUT_FILE = "data/final_shuffled/final_cleaned_shuffled.jsonl"
+NEAR_DUP_REPORT = "data/cleaned_jsonl/near_duplicate_clusters.json"
 TARGET_TEXT = "Sign in to read exclusive news"
 
 def normalize_text(text):
     return ' '.join(text.strip().split())
 
-def clean_jsonl(input_path, output_path, target_text):
+def clean_jsonl(input_path, output_path, target_text, incremental=watermarks.INCREMENTAL,
+                near_dup_threshold=NEAR_DUP_THRESHOLD, report_path=NEAR_DUP_REPORT):
     total = 0
     removed = 0
-    seen_inputs = set()
-
-    # 🧠 Load existing inputs to avoid duplicates across appends
-    if os.path.exists(output_path):
-        with open(output_path, 'r', encoding='utf-8') as existing:
-            for line in existing:
-                try:
-                    item = json.loads(line.strip())
-                    seen_inputs.add(item.get("input", "").strip())
-                except:
-                    continue
+    near_dupes = 0
+    # 🧠 Persistent index of every input already in the output; rebuilt only if the output changed behind its back
+    # (near_dup_threshold >= 1 turns the near-duplicate filter off, exact matches are still dropped)
+    index = DedupeIndex(output_path, threshold=near_dup_threshold)
+
+    # ⏩ Incremental runs only look at lines appended to the input since the last run
+    if incremental:
+        text, consumed = watermarks.read_appended_text(input_path, "clean:converted")
+        source = io.StringIO(text)
+    else:
+        consumed = watermarks.complete_end(input_path)
+        source = open(input_path, 'r', encoding='utf-8')
 
-    with open(input_path, 'r', encoding='utf-8') as infile, \
+    with source as infile, \
          open(output_path, 'a', encoding='utf-8') as outfile:  # append mode
 
         for line in infile:
@@ -45,43 +52,53 @@ def clean_jsonl(input_path, output_path, target_text):
                     not input_text or
                     input_text == target_text or
                     len(output_text) < 5 or
-                    input_text in seen_inputs
+                    index.contains(input_text)
                 ):
                     removed += 1
                     continue
 
-                seen_inputs.add(input_text)
+                # 🧬 Syndicated rewrites of a headline already kept
+                if index.is_near_duplicate(input_text):
+                    removed += 1
+                    near_dupes += 1
+                    continue
+
+                index.add_exact(input_text)
                 outfile.write(json.dumps(item, ensure_ascii=False) + '\n')
 
             except json.JSONDecodeError:
                 print(f"⚠️ Skipping malformed line: {line.strip()}")
 
+    index.commit()
+    watermarks.commit_range(input_path, "clean:converted", consumed)
+
     print(f"✅ [JSONL] Total rows processed: {total}")
-    print(f"🗑️ [JSONL] Rows removed: {removed}")
+    print(f"🗑️ [JSONL] Rows removed: {removed} ({near_dupes} near-duplicates)")
+    if index.near:
+        report_clusters(index.cluster_report(), report_path)
+    index.close()
     print(f"📁 Appended to file: {output_path}")
 
     # 👉 Automatically shuffle after cleaning
     shuffler(output_path, SHUFFLED_OUTPUT_FILE)
 
-def shuffler(input_path="data/cleaned_jsonl/final_cleaned.jsonl", output_path="data/cleaned_jsonl/final_cleaned_shuffled.jsonl"):
-    # 🔄 Read lines
-    with open(input_path, 'r', encoding='utf-8') as infile:
-        data = [json.loads(line) for line in infile]
-
-    # 🔀 Shuffle
-    random.shuffle(data)
+def report_clusters(clusters, report_path, top=5):
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(clusters, f, ensure_ascii=False, indent=2)
 
-    # 💾 Write shuffled lines
-    with open(output_path, 'w', encoding='utf-8') as outfile:
-        for item in data:
-            outfile.write(json.dumps(item, ensure_ascii=False) + '\n')
+    print(f"🧬 [JSONL] {len(clusters)} near-duplicate clusters, report saved to: {report_path}")
+    for cluster in clusters[:top]:
+        print(f"   {len(cluster['dropped'])}x ~ {cluster['kept']}")
 
-    print(f"🔀 Shuffled JSONL saved to: {output_path}")
+def shuffler(input_path="data/cleaned_jsonl/final_cleaned.jsonl", output_path="data/cleaned_jsonl/final_cleaned_shuffled.jsonl"):
+    # Byte-level, seedable shuffle that spills to disk past SHUFFLE_MEMORY_MB
+    return shuffle_jsonl(input_path, output_path)
 
-def jsonl_cleaner():
+def jsonl_cleaner(incremental=watermarks.INCREMENTAL):
     ext = os.path.splitext(INPUT_FILE)[1].lower()
     if ext == ".jsonl":
-        clean_jsonl(INPUT_FILE, OUTPUT_FILE, TARGET_TEXT)
+        clean_jsonl(INPUT_FILE, OUTPUT_FILE, TARGET_TEXT, incremental=incremental)
     else:
         print("❌ Unsupported file type. Please use a .jsonl file.")
 
@@ -0,0 +1,79 @@
+import os
+import math
+import random
+import hashlib
+import tempfile
+import contextlib
+
+# 🔧 Configuration
+SHUFFLE_SEED = int(os.getenv("SHUFFLE_SEED", "42"))
+SHUFFLE_MEMORY_MB = int(os.getenv("SHUFFLE_MEMORY_MB", "256"))  # above this the shuffle spills to bucket files
+VAL_FRACTION = float(os.getenv("SHUFFLE_VAL_FRACTION", "0"))  # 0 = no train/val split files
+
+def split_paths(output_path):
+    base, ext = os.path.splitext(output_path)
+    return f"{base}.train{ext}", f"{base}.val{ext}"
+
+def is_validation(line, seed, val_fraction):
+    # Hash-based assignment: a row keeps its split when the corpus grows or is reshuffled
+    digest = hashlib.blake2b(line, digest_size=8, key=str(seed).encode("utf-8")).digest()
+    return int.from_bytes(digest, "little") / 2 ** 64 < val_fraction
+
+def iter_lines(path):
+    # Raw line bytes: records are moved around, never parsed or re-serialized
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield line if line.endswith(b"\n") else line + b"\n"
+
+def _shuffled_buckets(input_path, rng, memory_budget, work_dir):
+    size = os.path.getsize(input_path)
+    if size <= memory_budget:
+        lines = list(iter_lines(input_path))
+        rng.shuffle(lines)
+        yield lines
+        return
+
+    # 🪣 Scatter every line into a random bucket file, then shuffle each bucket in memory.
+    # Buckets hold about half the budget on average, so peak memory stays bounded whatever the corpus size.
+    num_buckets = math.ceil(2 * size / memory_budget)
+    bucket_paths = [os.path.join(work_dir, f"bucket-{i:05d}") for i in range(num_buckets)]
+    with contextlib.ExitStack() as stack:
+        buckets = [stack.enter_context(open(p, 'wb')) for p in bucket_paths]
+        for line in iter_lines(input_path):
+            buckets[rng.randrange(num_buckets)].write(line)
+
+    for path in bucket_paths:
+        with open(path, 'rb') as f:
+            lines = f.readlines()
+        os.remove(path)
+        rng.shuffle(lines)
+        yield lines
+
+def shuffle_jsonl(input_path, output_path, seed=SHUFFLE_SEED, memory_mb=SHUFFLE_MEMORY_MB, val_fraction=VAL_FRACTION):
+    out_dir = os.path.dirname(output_path) or "."
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    outputs = [output_path] + (list(split_paths(output_path)) if val_fraction > 0 else [])
+    counts = {"total": 0, "train": 0, "val": 0}
+
+    with tempfile.TemporaryDirectory(dir=out_dir) as work_dir, contextlib.ExitStack() as stack:
+        # Written next to the targets and swapped in at the end, so readers never see a partial file
+        files = [stack.enter_context(open(p + ".tmp", 'wb')) for p in outputs]
+        for lines in _shuffled_buckets(input_path, rng, memory_mb * 1024 * 1024, work_dir):
+            files[0].writelines(lines)
+            counts["total"] += len(lines)
+            if val_fraction > 0:
+                for line in lines:
+                    split = "val" if is_validation(line, seed, val_fraction) else "train"
+                    files[2 if split == "val" else 1].write(line)
+                    counts[split] += 1
+
+    for path in outputs:
+        os.replace(path + ".tmp", path)
+
+    print(f"🔀 Shuffled {counts['total']} JSONL rows (seed={seed}) to: {output_path}")
+    if val_fraction > 0:
+        train_path, val_path = split_paths(output_path)
+        print(f"✂️ Split {counts['train']} train / {counts['val']} validation rows: {train_path}, {val_path}")
+    return counts
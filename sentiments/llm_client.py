@@ -0,0 +1,123 @@
+import os
+import time
+import random
+import asyncio
+import aiohttp
+
+# 🔧 Configuration
+CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))
+RATE_PER_SEC = float(os.getenv("LLM_RATE_PER_SEC", "4"))
+BURST = int(os.getenv("LLM_BURST", str(CONCURRENCY)))
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+REQUEST_TIMEOUT = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def latency_summary(latencies):
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": values[-1] if values else 0.0
+    }
+
+def retry_after_seconds(headers):
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None  # HTTP-date form; fall back to exponential backoff
+
+def backoff_seconds(attempt):
+    return min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+async def _post_chat(session, url, headers, payload, bucket, stats):
+    for attempt in range(MAX_RETRIES + 1):
+        await bucket.acquire()
+        start = time.perf_counter()
+        delay = None
+        try:
+            async with session.post(url, headers=headers, json=payload) as response:
+                if response.status == 200:
+                    data = await response.json(content_type=None)
+                    stats["latencies"].append(time.perf_counter() - start)
+                    return data['choices'][0]['message']['content']
+
+                body = await response.text()
+                stats["latencies"].append(time.perf_counter() - start)
+                if response.status not in RETRY_STATUSES:
+                    print(f"❌ Error {response.status}: {body}")
+                    return None
+                delay = retry_after_seconds(response.headers)
+                stats["retries"] += 1
+                print(f"⏳ {response.status} from LLM API, retry {attempt + 1}/{MAX_RETRIES}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, ValueError) as e:
+            stats["retries"] += 1
+            print(f"⚠️ Exception: {e!r}")
+
+        if attempt < MAX_RETRIES:
+            await asyncio.sleep(delay if delay is not None else backoff_seconds(attempt))
+    return None
+
+async def label_prompts_async(prompts, url, headers, build_payload, on_result=None,
+                              concurrency=CONCURRENCY, rate=RATE_PER_SEC, burst=BURST):
+    stats = {"latencies": [], "retries": 0, "failed": 0}
+    results = [None] * len(prompts)
+    bucket = TokenBucket(rate, burst)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # 🔌 One pooled session (keep-alive connections) for the whole run
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def worker(index, prompt):
+            async with semaphore:
+                output = await _post_chat(session, url, headers, build_payload(prompt), bucket, stats)
+            if output is None:
+                stats["failed"] += 1
+            results[index] = output
+            if on_result is not None:
+                on_result(index, output)
+
+        await asyncio.gather(*(worker(i, p) for i, p in enumerate(prompts)))
+
+    summary = latency_summary(stats["latencies"])
+    summary.update(retries=stats["retries"], failed=stats["failed"])
+    print(
+        f"📈 LLM latency p50={summary['p50']:.2f}s p90={summary['p90']:.2f}s p99={summary['p99']:.2f}s "
+        f"({summary['count']} requests, {summary['retries']} retries, {summary['failed']} failed)"
+    )
+    return results, summary
+
+def label_prompts(prompts, url, headers, build_payload, on_result=None, **kwargs):
+    return asyncio.run(label_prompts_async(prompts, url, headers, build_payload, on_result=on_result, **kwargs))
@@ -0,0 +1,88 @@
+import os
+import threading
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification, AutoModelForTokenClassification, pipeline
+
+# 🔧 Configuration
+FINBERT_MODEL = "ProsusAI/finbert"
+NER_MODEL = "dslim/bert-base-NER"
+FINBERT_REVISION = os.getenv("FINBERT_REVISION", "main")
+NER_REVISION = os.getenv("NER_REVISION", "main")
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")  # "torch" (fp32), "int8" (dynamic quantization) or "onnx"
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", "data/cache/onnx")
+BACKENDS = ("torch", "int8", "onnx")
+
+# 🧠 Models stay resident for the life of the process
+_models = {}
+_lock = threading.Lock()
+
+def _get_or_load(name, loader):
+    model = _models.get(name)
+    if model is None:
+        with _lock:
+            model = _models.get(name)
+            if model is None:
+                print(f"📦 Loading {name} (first use in this process)...")
+                model = loader()
+                _models[name] = model
+    return model
+
+def _load_model(auto_class, ort_class_name, name, revision, backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown INFERENCE_BACKEND {backend!r}, expected one of {', '.join(BACKENDS)}")
+
+    if backend == "onnx":
+        try:
+            import optimum.onnxruntime as ort
+        except ImportError:
+            raise ImportError("❌ The onnx backend needs optimum[onnxruntime]: pip install 'optimum[onnxruntime]'")
+        ort_class = getattr(ort, ort_class_name)
+        export_dir = os.path.join(ONNX_CACHE_DIR, f"{name.replace('/', '--')}@{revision}")
+        if os.path.isdir(export_dir):
+            return ort_class.from_pretrained(export_dir)
+        # First use exports the checkpoint to ONNX; later processes load the saved graph
+        print(f"🛠️ Exporting {name}@{revision} to ONNX in {export_dir}...")
+        model = ort_class.from_pretrained(name, revision=revision, export=True)
+        model.save_pretrained(export_dir)
+        return model
+
+    model = auto_class.from_pretrained(name, revision=revision)
+    model.eval()
+    if backend == "int8":
+        # int8 weights for every Linear layer, activations quantized on the fly: CPU-only
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+def _load_finbert(backend=INFERENCE_BACKEND):
+    tokenizer = AutoTokenizer.from_pretrained(FINBERT_MODEL, revision=FINBERT_REVISION)
+    model = _load_model(AutoModelForSequenceClassification, "ORTModelForSequenceClassification", FINBERT_MODEL, FINBERT_REVISION, backend)
+    return tokenizer, model
+
+def _load_ner_pipeline(backend=INFERENCE_BACKEND):
+    ner_tokenizer = AutoTokenizer.from_pretrained(NER_MODEL, revision=NER_REVISION)
+    ner_model = _load_model(AutoModelForTokenClassification, "ORTModelForTokenClassification", NER_MODEL, NER_REVISION, backend)
+    return pipeline("ner", model=ner_model, tokenizer=ner_tokenizer, grouped_entities=True)
+
+def get_finbert(backend=INFERENCE_BACKEND):
+    return _get_or_load(f"{FINBERT_MODEL}:{backend}", lambda: _load_finbert(backend))
+
+def get_ner_pipeline(backend=INFERENCE_BACKEND):
+    return _get_or_load(f"{NER_MODEL}:{backend}", lambda: _load_ner_pipeline(backend))
+
+def warm_up():
+    get_finbert()
+    get_ner_pipeline()
+    print("🔥 Sentiment models are warm.")
+
+def model_revision(backend=INFERENCE_BACKEND):
+    # Cached sentiment labels are only valid for the exact FinBERT (and numeric backend) that produced them;
+    # tickers are cached separately under ner_revision()
+    revision = f"{FINBERT_MODEL}@{FINBERT_REVISION}"
+    return revision if backend == "torch" else f"{revision}/{backend}"
+
+def ner_revision(backend=INFERENCE_BACKEND):
+    revision = f"{NER_MODEL}@{NER_REVISION}"
+    return revision if backend == "torch" else f"{revision}/{backend}"
+
+def loaded_models():
+    return sorted(_models)
@@ -0,0 +1,49 @@
+import os
+import re
+import hashlib
+import numpy as np
+
+# 🔧 Configuration
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.75"))  # estimated Jaccard similarity that counts as a duplicate
+NUM_PERM = int(os.getenv("NEAR_DUP_NUM_PERM", "128"))
+SHINGLE_SIZE = 5  # character n-grams survive small wording changes better than word n-grams on short headlines
+SEED = 1
+_PRIME = np.uint64(4294967291)  # largest 32-bit prime: a * h + b stays below 2**64
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz  # numpy < 2.0 only has trapz
+
+def shingles(text):
+    text = re.sub(r"[^\w%$ ]+", " ", text.casefold())
+    text = " ".join(text.split())
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+def _permutations(num_perm, seed=SEED):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+    return a, b
+
+def minhash_signature(text, permutations):
+    a, b = permutations
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles(text)),
+        dtype=np.uint64
+    )
+    # One row per shingle, one column per permutation; the column minimum is the signature
+    return ((np.outer(hashes, a) + b) % _PRIME).min(axis=0).astype(np.uint32)
+
+def choose_bands(threshold, num_perm):
+    # Pick (bands, rows) that minimise false positives below and false negatives above the threshold
+    def collision(s, b, r):
+        return 1 - (1 - s ** r) ** b
+
+    below = np.linspace(0, threshold, 50)
+    above = np.linspace(threshold, 1, 50)
+    best = None
+    for b in range(1, num_perm + 1):
+        r = num_perm // b
+        error = _trapezoid(collision(below, b, r), below) + _trapezoid(1 - collision(above, b, r), above)
+        if best is None or error < best[0]:
+            best = (error, b, r)
+    return best[1], best[2]
@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import multiprocessing
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sentiments.finbert_engine import score_headlines, predict_sentiments_cached, BATCH_SIZE
+from sentiments.model_registry import get_finbert, model_revision, INFERENCE_BACKEND
+from sentiments.sentiment_cache import SentimentCache
+
+# 🔧 Configuration
+THREADS_PER_WORKER = int(os.getenv("BACKFILL_THREADS_PER_WORKER", "2"))
+BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", str(max(1, (os.cpu_count() or 1) // THREADS_PER_WORKER))))
+SHARD_ROWS = 2000  # small shards keep every worker busy until the end
+
+def _init_worker(threads, backend):
+    # Each worker owns a few cores: no oversubscription between torch thread pools
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    get_finbert(backend)
+
+def _score_shard(shard_id, texts, batch_size, backend):
+    tokenizer, model = get_finbert(backend)
+    start = time.perf_counter()
+    labels, probs = score_headlines(texts, tokenizer, model, batch_size=batch_size)
+    return shard_id, os.getpid(), labels, probs, time.perf_counter() - start
+
+class ShardedScorer:
+    # Drop-in for score_headlines backed by one process pool: each worker loads FinBERT once and is
+    # reused by every call (streamed chunks included) until close()
+    def __init__(self, workers=BACKFILL_WORKERS, threads=THREADS_PER_WORKER, backend=INFERENCE_BACKEND):
+        self.workers = workers
+        self.threads = threads
+        self.backend = backend
+        # spawn: forked copies of a process that already touched torch can deadlock
+        context = multiprocessing.get_context("spawn")
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(threads, backend))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __call__(self, texts, tokenizer=None, model=None, batch_size=BATCH_SIZE):
+        # Same (labels, probs) in input order; tokenizer/model are unused, every worker has its own copy.
+        # Shards shrink for small calls so every worker still gets one.
+        if not texts:
+            return [], []
+        shard_rows = max(1, min(SHARD_ROWS, -(-len(texts) // self.workers)))
+        shards = [texts[i:i + shard_rows] for i in range(0, len(texts), shard_rows)]
+
+        results = {}
+        per_worker = {}
+        start = time.perf_counter()
+        futures = [self.pool.submit(_score_shard, i, shard, batch_size, self.backend) for i, shard in enumerate(shards)]
+        for future in as_completed(futures):
+            shard_id, pid, labels, probs, elapsed = future.result()
+            results[shard_id] = (labels, probs)
+            rows, seconds = per_worker.get(pid, (0, 0.0))
+            per_worker[pid] = (rows + len(labels), seconds + elapsed)
+            print(f"🧩 Shard {shard_id + 1}/{len(shards)} scored by worker {pid} ({len(labels) / max(elapsed, 1e-9):.1f} headlines/s)")
+
+        total = time.perf_counter() - start
+        for pid, (rows, seconds) in sorted(per_worker.items()):
+            print(f"⚙️ Worker {pid}: {rows} headlines in {seconds:.1f}s ({rows / max(seconds, 1e-9):.1f}/s)")
+        print(f"🚀 Backfill scored {len(texts)} headlines on {self.workers} workers x {self.threads} threads "
+              f"in {total:.1f}s ({len(texts) / max(total, 1e-9):.1f}/s overall)")
+
+        labels, probs = [], []
+        for shard_id in range(len(shards)):
+            labels += results[shard_id][0]
+            probs += results[shard_id][1]
+        return labels, probs
+
+def score_sharded(texts, tokenizer=None, model=None, batch_size=BATCH_SIZE, workers=BACKFILL_WORKERS, threads=THREADS_PER_WORKER,
+                  backend=INFERENCE_BACKEND):
+    # One-off sharded scoring; the pool lives for this call only
+    with ShardedScorer(workers, threads, backend) as scorer:
+        return scorer(texts, batch_size=batch_size)
+
+def backfill_csv(input_csv, output_csv, text_column="headline", workers=BACKFILL_WORKERS, threads=THREADS_PER_WORKER, batch_size=BATCH_SIZE):
+    # Re-scores an archive; results also land in the sentiment cache for later pipeline runs
+    df = pd.read_csv(input_csv)
+    if text_column not in df.columns:
+        raise ValueError(f"❌ Column '{text_column}' not found in {input_csv}")
+
+    cache = SentimentCache(model_revision())
+    try:
+        with ShardedScorer(workers, threads) as scorer:
+            sentiments, _ = predict_sentiments_cached(df[text_column].fillna("").tolist(), None, None, cache,
+                                                      batch_size=batch_size, score_fn=scorer)
+        cache.report("backfill")
+    finally:
+        cache.close()
+
+    df["sentiment"] = sentiments
+    os.makedirs(os.path.dirname(output_csv) or ".", exist_ok=True)
+    df.to_csv(output_csv, index=False)
+    print(f"✅ Backfilled {len(df)} rows to: {output_csv}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python -m sentiments.sentiment_backfill <input_csv> <output_csv> [text_column] [workers]")
+        sys.exit(1)
+    backfill_csv(sys.argv[1], sys.argv[2],
+                 text_column=sys.argv[3] if len(sys.argv) > 3 else "headline",
+                 workers=int(sys.argv[4]) if len(sys.argv) > 4 else BACKFILL_WORKERS)
@@ -0,0 +1,94 @@
+import os
+import json
+import sqlite3
+import hashlib
+
+# 🔧 Configuration
+CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "data/cache/sentiment_cache.sqlite")
+QUERY_CHUNK = 500  # stay well below SQLite's bound-parameter limit
+
+def normalize_headline(text):
+    return ' '.join(str(text).strip().split()).casefold()
+
+def headline_key(text, revision):
+    return hashlib.sha256(f"{revision}\x1f{normalize_headline(text)}".encode("utf-8")).hexdigest()
+
+def ticker_key(text, revision):
+    # Ticker matching is case-sensitive, so unlike sentiment the headline's case is part of the key
+    return hashlib.sha256(f"{revision}\x1f{' '.join(str(text).split())}".encode("utf-8")).hexdigest()
+
+class SentimentCache:
+    def __init__(self, revision, path=CACHE_PATH):
+        self.revision = revision
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sentiment_cache (
+                key TEXT PRIMARY KEY,
+                sentiment TEXT NOT NULL,
+                probs TEXT NOT NULL
+            )
+        """)
+        # Tickers live apart from sentiment: their key covers the tagger and symbol universe, not FinBERT
+        self.conn.execute("CREATE TABLE IF NOT EXISTS ticker_cache (key TEXT PRIMARY KEY, tickers TEXT NOT NULL)")
+        self.conn.commit()
+
+    def get_many(self, headlines):
+        keys = [headline_key(h, self.revision) for h in headlines]
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for i in range(0, len(unique_keys), QUERY_CHUNK):
+            chunk = unique_keys[i:i + QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, sentiment, probs FROM sentiment_cache WHERE key IN ({placeholders})",
+                chunk
+            )
+            for key, sentiment, probs in rows:
+                found[key] = {"sentiment": sentiment, "probs": json.loads(probs)}
+
+        entries = [found.get(key) for key in keys]
+        hits = sum(entry is not None for entry in entries)
+        self.hits += hits
+        self.misses += len(entries) - hits
+        return entries
+
+    def put_many(self, rows):
+        # rows: (headline, sentiment, probs)
+        records = [(headline_key(h, self.revision), sentiment, json.dumps(probs)) for h, sentiment, probs in rows]
+        self.conn.executemany("""
+            INSERT INTO sentiment_cache (key, sentiment, probs) VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET sentiment = excluded.sentiment, probs = excluded.probs
+        """, records)
+        self.conn.commit()
+
+    def get_tickers(self, headlines, revision):
+        # revision identifies the extraction (tagger version, symbol universe, NER model); None = never extracted
+        keys = [ticker_key(h, revision) for h in headlines]
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for i in range(0, len(unique_keys), QUERY_CHUNK):
+            chunk = unique_keys[i:i + QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for key, tickers in self.conn.execute(f"SELECT key, tickers FROM ticker_cache WHERE key IN ({placeholders})", chunk):
+                found[key] = json.loads(tickers)
+        return [found.get(key) for key in keys]
+
+    def put_tickers(self, rows, revision):
+        records = [(ticker_key(h, revision), json.dumps(tickers)) for h, tickers in rows]
+        self.conn.executemany("INSERT OR REPLACE INTO ticker_cache (key, tickers) VALUES (?, ?)", records)
+        self.conn.commit()
+
+    def report(self, stage):
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        print(f"🗃️ [{stage}] Sentiment cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)")
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,37 @@
+import os
+import pandas as pd
+from sentiments.model_registry import model_revision
+from sentiments.sentiment_cache import SentimentCache
+from pipeline import watermarks
+from pipeline.chunked_csv import stream_csv_stage, STREAMING, CHUNK_ROWS
+
+def run_sentiment_stage(input_path, output_path, watermark_name, score, label,
+                        incremental=watermarks.INCREMENTAL, streaming=STREAMING, chunk_rows=CHUNK_ROWS):
+    # Shared driver for the sentiment stages: score(df, cache) -> scored frame, written to output_path
+    cache = SentimentCache(model_revision())
+    try:
+        if streaming:
+            # 🌊 Fixed-size chunks appended as they are scored; progress offsets allow a resume after a crash
+            stream_csv_stage(input_path, output_path, lambda chunk: score(chunk, cache), watermark_name,
+                             incremental=incremental, chunk_rows=chunk_rows)
+            cache.report(label)
+            return
+
+        # Load the input (only the rows appended since the last run when incremental)
+        if incremental:
+            df, consumed = watermarks.read_appended_csv(input_path, watermark_name)
+        else:
+            df = pd.read_csv(input_path)
+            consumed = watermarks.complete_end(input_path)
+        df = score(df, cache)
+        cache.report(label)
+    finally:
+        cache.close()
+
+    # Save output
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if incremental:
+        watermarks.append_csv(df, output_path)
+    else:
+        df.to_csv(output_path, index=False)
+    watermarks.commit_range(input_path, watermark_name, consumed)